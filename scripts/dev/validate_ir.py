@@ -3,13 +3,64 @@
 
 import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Prefer the Rust-backed jsonschema-rs validator, falling back to jsonschema
 try:
-    import jsonschema
+    import jsonschema_rs
+
+    def _build_validator(schema):
+        # validator_for also checks the schema itself
+        return jsonschema_rs.validator_for(schema)
+
+    ValidationError = jsonschema_rs.ValidationError
+except ImportError:
+    try:
+        import jsonschema
+    except ImportError:
+        print("Error: jsonschema package not installed. Run: pip install jsonschema-rs (or jsonschema)")
+        sys.exit(1)
+
+    def _build_validator(schema):
+        validator_cls = jsonschema.validators.validator_for(schema)
+        validator_cls.check_schema(schema)
+        return validator_cls(schema)
+
+    ValidationError = jsonschema.ValidationError
+
+try:
+    import orjson
+
+    def _load_json(path):
+        return orjson.loads(path.read_bytes())
+
 except ImportError:
-    print("Error: jsonschema package not installed. Run: pip install jsonschema")
-    sys.exit(1)
+
+    def _load_json(path):
+        return json.loads(path.read_bytes())
+
+
+# Per-process validator, built once by _init_worker
+_validator = None
+
+
+def _init_worker(schema):
+    global _validator
+    _validator = _build_validator(schema)
+
+
+def _validate_one(example_file):
+    """Validate a single example file, returning (name, error or None)."""
+    try:
+        example = _load_json(example_file)
+
+        _validator.validate(example)
+        return example_file.name, None
+    except ValidationError as e:
+        return example_file.name, e.message
+    except json.JSONDecodeError as e:
+        return example_file.name, f"Invalid JSON: {e}"
 
 
 def main():
@@ -23,8 +74,10 @@ def main():
         sys.exit(1)
 
     # Load schema
-    with open(schema_path) as f:
-        schema = json.load(f)
+    schema = _load_json(schema_path)
+
+    # Check the schema up front so a bad schema fails before any fan-out
+    _build_validator(schema)
 
     # Find all example files
     example_files = list(examples_dir.glob("*.json"))
@@ -35,20 +88,17 @@ def main():
 
     print(f"Validating {len(example_files)} IR example(s) against schema...")
 
+    # Each worker builds its validator once; examples are fanned out in chunks
+    with ProcessPoolExecutor(initializer=_init_worker, initargs=(schema,)) as ex:
+        results = list(ex.map(_validate_one, example_files, chunksize=8))
+
     errors = []
-    for example_file in example_files:
-        try:
-            with open(example_file) as f:
-                example = json.load(f)
-
-            jsonschema.validate(example, schema)
-            print(f"  ✓ {example_file.name}")
-        except jsonschema.ValidationError as e:
-            print(f"  ✗ {example_file.name}: {e.message}")
-            errors.append((example_file.name, e.message))
-        except json.JSONDecodeError as e:
-            print(f"  ✗ {example_file.name}: Invalid JSON - {e}")
-            errors.append((example_file.name, f"Invalid JSON: {e}"))
+    for name, error in results:
+        if error is None:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {error}")
+            errors.append((name, error))
 
     if errors:
         print(f"\n{len(errors)} validation error(s) found.")
@@ -1,81 +1,226 @@
+import asyncio
 import pytest
-import pytest_asyncio
 import os
+from types import SimpleNamespace
+from uuid import uuid4
 
 # LangGraph SDK uses async operations
 from langgraph_sdk import get_client
 
+from rest_client import ROOT_URL, APIClient, make_pool
 
-@pytest.fixture
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+def pytest_asyncio_loop_factories(config, item):
+    """Run the suite on uvloop when available, else the default asyncio loop."""
+    if uvloop is not None:
+        return {"uvloop": uvloop.new_event_loop}
+    return {"asyncio": asyncio.new_event_loop}
+
+
+@pytest.fixture(scope="session")
 def api_url():
     """Get the API base URL from environment or default."""
     return os.getenv("API_BASE_URL", "http://localhost:8082")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client(api_url):
     """Create a LangGraph SDK client."""
     return get_client(url=api_url)
 
 
-@pytest_asyncio.fixture
+@pytest.fixture(scope="session")
 async def async_client(api_url):
-    """Create an async LangGraph SDK client."""
+    """Create an async LangGraph SDK client shared by the whole session.
+
+    Reusing one client keeps its connection pool (and keep-alive connections)
+    warm across tests instead of rebuilding it per test.
+    """
     return get_client(url=api_url)
 
 
-@pytest_asyncio.fixture
-async def assistant(async_client):
-    """Create a test assistant and clean up after the test."""
+@pytest.fixture(scope="session")
+async def created_ids(async_client):
+    """Collect IDs of resources created by tests and delete them in bulk.
+
+    Tests append to ``created_ids["assistants"]`` / ``created_ids["threads"]``
+    instead of deleting inline; all deletes are issued concurrently once at
+    the end of the session.
+    """
+    ids = {"assistants": [], "threads": []}
+    yield ids
+    await asyncio.gather(
+        *(async_client.assistants.delete(i) for i in ids["assistants"]),
+        *(async_client.threads.delete(i) for i in ids["threads"]),
+        return_exceptions=True,  # Ignore cleanup errors
+    )
+
+
+@pytest.fixture
+def make_assistant(async_client, created_ids):
+    """Factory that creates assistants and registers them for bulk cleanup."""
+    async def _make_assistant(**kwargs):
+        assistant = await async_client.assistants.create(**kwargs)
+        created_ids["assistants"].append(assistant["assistant_id"])
+        return assistant
+
+    return _make_assistant
+
+
+@pytest.fixture(scope="session")
+def session_tag():
+    """A value unique to this session (and to each xdist worker's session)."""
+    return uuid4().hex
+
+
+@pytest.fixture(scope="session")
+async def readonly_assistant(async_client, created_ids, session_tag):
+    """Create one test assistant shared by tests that never mutate it.
+
+    It is tagged with ``session_tag`` so it can be found by metadata search
+    without matching assistants created by other sessions or workers.
+    """
+    assistant = await async_client.assistants.create(
+        graph_id="simple_echo",
+        name="test-assistant-readonly",
+        metadata={"test": True, "session": session_tag}
+    )
+    created_ids["assistants"].append(assistant["assistant_id"])
+    return assistant
+
+
+@pytest.fixture(scope="session")
+async def searchable_assistant(async_client, created_ids):
+    """Create one assistant tagged with a per-session unique metadata value.
+
+    Yields ``(assistant, sentinel)`` so search tests can look it up without
+    colliding with assistants left over from earlier runs.
+    """
+    sentinel = uuid4().hex
+    assistant = await async_client.assistants.create(
+        graph_id="simple_echo",
+        name=f"search-{sentinel}",
+        metadata={"searchable": sentinel}
+    )
+    created_ids["assistants"].append(assistant["assistant_id"])
+    return assistant, sentinel
+
+
+@pytest.fixture
+async def assistant(async_client, created_ids):
+    """Create a test assistant, deleted in bulk at the end of the session."""
     assistant = await async_client.assistants.create(
         graph_id="simple_echo",
         name="test-assistant",
         metadata={"test": True}
     )
-    yield assistant
-    try:
-        await async_client.assistants.delete(assistant["assistant_id"])
-    except Exception:
-        pass  # Ignore cleanup errors
+    created_ids["assistants"].append(assistant["assistant_id"])
+    return assistant
 
 
-@pytest_asyncio.fixture
-async def thread(async_client):
-    """Create a test thread and clean up after the test."""
+@pytest.fixture
+async def thread(async_client, created_ids):
+    """Create a test thread, deleted in bulk at the end of the session."""
     thread = await async_client.threads.create()
-    yield thread
-    try:
-        await async_client.threads.delete(thread["thread_id"])
-    except Exception:
-        pass  # Ignore cleanup errors
+    created_ids["threads"].append(thread["thread_id"])
+    return thread
+
+
+@pytest.fixture(scope="module")
+async def updatable_thread(async_client, created_ids):
+    """Create one thread shared by a module's state-update tests.
+
+    Tests sharing it must write disjoint state keys, since updates merge
+    into whatever earlier tests left behind.
+    """
+    thread = await async_client.threads.create()
+    created_ids["threads"].append(thread["thread_id"])
+    return thread
+
 
+@pytest.fixture
+def runctx(async_client, assistant, thread):
+    """Bundle the client with a fresh assistant and thread ID for run tests."""
+    return SimpleNamespace(
+        client=async_client,
+        assistant_id=assistant["assistant_id"],
+        thread_id=thread["thread_id"],
+    )
 
-@pytest_asyncio.fixture
-async def thread_with_state(async_client, assistant):
+
+@pytest.fixture
+async def thread_with_state(async_client, readonly_assistant, created_ids):
     """Create a thread with some initial state from a run."""
     thread = await async_client.threads.create()
+    created_ids["threads"].append(thread["thread_id"])
 
     # Create and wait for a run to generate state
     run = await async_client.runs.create(
         thread_id=thread["thread_id"],
-        assistant_id=assistant["assistant_id"],
+        assistant_id=readonly_assistant["assistant_id"],
         input={"message": "initial state"}
     )
 
-    # Wait for run to complete (with timeout)
-    import asyncio
-    for _ in range(30):
+    # Wait for run to complete, backing off from 10ms up to 500ms between
+    # polls so fast runs don't pay a fixed half-second sleep (15s timeout)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + 15
+    delay = 0.01
+    while loop.time() < deadline:
         run_status = await async_client.runs.get(
             thread_id=thread["thread_id"],
             run_id=run["run_id"]
         )
         if run_status["status"] in ["success", "completed", "error", "failed"]:
             break
-        await asyncio.sleep(0.5)
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.6, 0.5)
+
+    return thread
+
+
+# ============== REST client fixtures ==============
+
+@pytest.fixture(scope="session")
+def http():
+    """Create one HTTP connection pool for the whole run, warmed with a health check."""
+    pool = make_pool()
+    # Open the first connection (and resolve DNS) before any test is timed
+    pool.request("GET", f"{ROOT_URL}/health")
+    yield pool
+    pool.clear()
+
+
+@pytest.fixture(scope="session")
+def api_client(http):
+    """Create one APIClient shared by the whole session."""
+    return APIClient(http)
+
+
+@pytest.fixture(scope="session")
+def shared_assistant(api_client):
+    """Create one assistant ID for tests that only run against it."""
+    return api_client.create_assistant()["assistant_id"]
+
+
+@pytest.fixture(scope="session")
+def shared_thread(api_client):
+    """Create one thread ID for tests that don't need an isolated thread."""
+    return api_client.create_thread()["thread_id"]
+
+
+@pytest.fixture
+def fresh_thread(api_client):
+    """Create a new thread ID for tests that copy or delete it."""
+    return api_client.create_thread()["thread_id"]
 
-    yield thread
 
-    try:
-        await async_client.threads.delete(thread["thread_id"])
-    except Exception:
-        pass
+@pytest.fixture(scope="module")
+def state_thread(api_client):
+    """Create one thread ID shared by a module's thread-state read/update tests."""
+    return api_client.create_thread()["thread_id"]
@@ -0,0 +1,126 @@
+"""
+REST client shared by the HTTP-level conformance tests.
+
+Wraps DuraGraph's LangGraph-compatible REST API (``/api/v1``) directly on a
+``urllib3.PoolManager``; the tests only need plain JSON GET/POST/DELETE, so
+the extra per-call work ``requests`` does (hooks, cookies, adapter lookup)
+buys nothing here.
+"""
+import orjson
+import pytest
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+BASE_URL = os.environ.get("API_BASE_URL", "http://localhost:8081/api/v1")
+# Server root for system endpoints (/health, /ok, /info) outside the API prefix
+ROOT_URL = BASE_URL.removesuffix("/api/v1")
+
+# Ask for compressed bodies (list endpoints can be large); urllib3 decodes them
+DEFAULT_HEADERS = urllib3.util.make_headers(accept_encoding=True)
+# Per-request headers replace the pool defaults, so repeat them here
+JSON_HEADERS = {**DEFAULT_HEADERS, "Content-Type": "application/json"}
+
+
+def make_pool():
+    """Create a keep-alive connection pool for talking to the API."""
+    return urllib3.PoolManager(num_pools=4, maxsize=32, block=False, headers=DEFAULT_HEADERS)
+
+
+class APIClient:
+    def __init__(self, http=None, base_url=BASE_URL):
+        self.base_url = base_url
+        # Every request this client makes goes through one connection pool
+        self.http = http or make_pool()
+        # Endpoint prefixes, built once so calls only interpolate the IDs
+        self._health_url = f"{base_url.removesuffix('/api/v1')}/health"
+        self._assistants_url = f"{base_url}/assistants"
+        self._threads_url = f"{base_url}/threads"
+
+    def close(self):
+        self.http.clear()
+
+    def get(self, url):
+        return self.http.request("GET", url)
+
+    def post(self, url, data):
+        """POST data as JSON, encoded with orjson."""
+        return self.http.request("POST", url, body=orjson.dumps(data), headers=JSON_HEADERS)
+
+    def delete(self, url):
+        return self.http.request("DELETE", url)
+
+    @staticmethod
+    def raise_for_status(r):
+        if r.status >= 400:
+            raise urllib3.exceptions.HTTPError(f"{r.status} Error for url: {r.url}")
+
+    @classmethod
+    def _json(cls, r, skip_reason=None):
+        """Decode r as JSON, checking the status first so skips/errors never parse the body."""
+        if r.status == 501 and skip_reason:
+            pytest.skip(skip_reason)
+        cls.raise_for_status(r)
+        return orjson.loads(r.data)
+
+    # Public name for tests that issue their own requests
+    json = _json
+
+    def health(self):
+        r = self.get(self._health_url)
+        return r.status == 200
+
+    def create_assistant(self, payload=None):
+        data = payload or {"name": "conformance-assistant", "model": "test"}
+        r = self.post(self._assistants_url, data)
+        return self._json(r, skip_reason="Assistants API not implemented yet (501)")
+
+    def get_assistant(self, assistant_id):
+        r = self.get(f"{self._assistants_url}/{assistant_id}")
+        return self._json(r)
+
+    def delete_assistant(self, assistant_id):
+        return self.delete(f"{self._assistants_url}/{assistant_id}")
+
+    def create_thread(self):
+        r = self.post(self._threads_url, {})
+        return self._json(r, skip_reason="Threads API not implemented yet (501)")
+
+    def get_thread(self, thread_id):
+        r = self.get(f"{self._threads_url}/{thread_id}")
+        return self._json(r)
+
+    def delete_thread(self, thread_id):
+        return self.delete(f"{self._threads_url}/{thread_id}")
+
+    def create_message(self, thread_id, content="hello", role="user"):
+        r = self.post(
+            f"{self._threads_url}/{thread_id}/messages",
+            {"role": role, "content": content},
+        )
+        return self._json(r, skip_reason="Messages API not implemented yet (501)")
+
+    def start_run(self, assistant_id, thread_id, input_data=None):
+        """Create a run using LangGraph-compatible path: POST /threads/{thread_id}/runs"""
+        data = {
+            "assistant_id": assistant_id,
+            "input": input_data or {"message": "hello"},
+        }
+        r = self.post(f"{self._threads_url}/{thread_id}/runs", data)
+        return self._json(r, skip_reason="Runs API not implemented yet (501)")
+
+    def get_run(self, thread_id, run_id):
+        """Get a run using LangGraph-compatible path: GET /threads/{thread_id}/runs/{run_id}"""
+        r = self.get(f"{self._threads_url}/{thread_id}/runs/{run_id}")
+        return self._json(r, skip_reason="GET /runs not implemented yet (501)")
+
+
+def run_concurrently(*calls):
+    """Run independent zero-argument calls in parallel and return their results in order.
+
+    Setup steps such as creating an assistant and a thread don't depend on each
+    other, so overlapping them costs one round trip instead of several.
+    """
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = [executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
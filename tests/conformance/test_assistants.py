@@ -7,13 +7,13 @@ DuraGraph compatibility with LangGraph Cloud API.
 import pytest
 import asyncio
 
+# Shares session-scoped assistants, so keep the module on one worker
+pytestmark = pytest.mark.xdist_group("assistants")
 
-pytestmark = pytest.mark.asyncio
 
-
-async def test_create_assistant(async_client):
+async def test_create_assistant(make_assistant):
     """Test creating an assistant with all fields."""
-    assistant = await async_client.assistants.create(
+    assistant = await make_assistant(
         graph_id="simple_echo",
         name="test-assistant-create",
         metadata={"key": "value", "test": True}
@@ -22,26 +22,20 @@ async def test_create_assistant(async_client):
     assert "assistant_id" in assistant
     assert assistant["name"] == "test-assistant-create"
 
-    # Cleanup
-    await async_client.assistants.delete(assistant["assistant_id"])
 
-
-async def test_create_assistant_minimal(async_client):
+async def test_create_assistant_minimal(make_assistant):
     """Test creating an assistant with minimal fields."""
-    assistant = await async_client.assistants.create(
+    assistant = await make_assistant(
         graph_id="simple_echo",
         name="minimal-assistant"  # Name is required by DuraGraph
     )
 
     assert "assistant_id" in assistant
 
-    # Cleanup
-    await async_client.assistants.delete(assistant["assistant_id"])
 
-
-async def test_get_assistant(async_client, assistant):
+async def test_get_assistant(async_client, readonly_assistant):
     """Test getting an assistant by ID."""
-    assistant_id = assistant["assistant_id"]
+    assistant_id = readonly_assistant["assistant_id"]
 
     fetched = await async_client.assistants.get(assistant_id)
 
@@ -96,31 +90,28 @@ async def test_delete_assistant(async_client):
             raise
 
 
-async def test_list_assistants(async_client, assistant):
+async def test_list_assistants(async_client, readonly_assistant, session_tag):
     """Test listing assistants using search."""
-    # LangGraph SDK uses search() instead of list()
-    assistants = await async_client.assistants.search()
+    # LangGraph SDK uses search() instead of list(). Filter on the fixture's
+    # per-session tag so assistants created by other tests or xdist workers
+    # can't push ours out of the page.
+    assistants = await async_client.assistants.search(metadata={"session": session_tag})
 
     assert isinstance(assistants, list)
     assert len(assistants) > 0
 
     # Our test assistant should be in the list
     assistant_ids = [a["assistant_id"] for a in assistants]
-    assert assistant["assistant_id"] in assistant_ids
+    assert readonly_assistant["assistant_id"] in assistant_ids
 
 
-async def test_search_assistants(async_client):
+async def test_search_assistants(async_client, searchable_assistant):
     """Test searching assistants by metadata."""
-    # Create assistant with searchable metadata
-    assistant = await async_client.assistants.create(
-        graph_id="simple_echo",
-        name="search-test",
-        metadata={"searchable": "unique-value-123"}
-    )
+    assistant, sentinel = searchable_assistant
 
     try:
         results = await async_client.assistants.search(
-            metadata={"searchable": "unique-value-123"}
+            metadata={"searchable": sentinel}
         )
 
         assert isinstance(results, list)
@@ -134,13 +125,11 @@ async def test_search_assistants(async_client):
         if "not implemented" in str(e).lower() or "501" in str(e):
             pytest.skip("Assistant search not implemented yet")
         raise
-    finally:
-        await async_client.assistants.delete(assistant["assistant_id"])
 
 
-async def test_assistant_versions(async_client, assistant):
+async def test_assistant_versions(async_client, readonly_assistant):
     """Test getting assistant versions."""
-    assistant_id = assistant["assistant_id"]
+    assistant_id = readonly_assistant["assistant_id"]
 
     try:
         versions = await async_client.assistants.get_versions(assistant_id)
@@ -164,9 +153,9 @@ async def test_assistant_versions(async_client, assistant):
         raise
 
 
-async def test_assistant_schemas(async_client, assistant):
+async def test_assistant_schemas(async_client, readonly_assistant):
     """Test getting assistant schemas."""
-    assistant_id = assistant["assistant_id"]
+    assistant_id = readonly_assistant["assistant_id"]
 
     try:
         schemas = await async_client.assistants.get_schemas(assistant_id)
@@ -207,10 +196,10 @@ async def test_set_assistant_latest(async_client, assistant):
         raise
 
 
-async def test_create_assistant_with_config(async_client):
+async def test_create_assistant_with_config(make_assistant):
     """Test creating assistant with config."""
     try:
-        assistant = await async_client.assistants.create(
+        assistant = await make_assistant(
             graph_id="simple_echo",
             name="configured-assistant",
             config={"configurable": {"model": "gpt-4"}}
@@ -218,9 +207,6 @@ async def test_create_assistant_with_config(async_client):
 
         assert "assistant_id" in assistant
 
-        # Cleanup
-        await async_client.assistants.delete(assistant["assistant_id"])
-
     except TypeError:
         pytest.skip("Config parameter not supported in this SDK version")
     except Exception as e:
@@ -229,9 +215,9 @@ async def test_create_assistant_with_config(async_client):
         raise
 
 
-async def test_assistant_graph_id(async_client, assistant):
+async def test_assistant_graph_id(async_client, readonly_assistant):
     """Test that assistant has a graph_id."""
-    assistant_id = assistant["assistant_id"]
+    assistant_id = readonly_assistant["assistant_id"]
 
     fetched = await async_client.assistants.get(assistant_id)
 
@@ -239,7 +225,7 @@ async def test_assistant_graph_id(async_client, assistant):
     assert "graph_id" in fetched or "metadata" in fetched
 
 
-async def test_assistant_metadata_persistence(async_client):
+async def test_assistant_metadata_persistence(async_client, make_assistant):
     """Test that assistant metadata is persisted correctly."""
     metadata = {
         "string_key": "value",
@@ -248,25 +234,21 @@ async def test_assistant_metadata_persistence(async_client):
         "nested": {"inner": "data"}
     }
 
-    assistant = await async_client.assistants.create(
+    assistant = await make_assistant(
         graph_id="simple_echo",
         name="metadata-test",
         metadata=metadata
     )
 
-    try:
-        fetched = await async_client.assistants.get(assistant["assistant_id"])
-
-        assert fetched["metadata"]["string_key"] == "value"
-        assert fetched["metadata"]["number_key"] == 42
-        assert fetched["metadata"]["bool_key"] == True
-        assert fetched["metadata"]["nested"]["inner"] == "data"
+    fetched = await async_client.assistants.get(assistant["assistant_id"])
 
-    finally:
-        await async_client.assistants.delete(assistant["assistant_id"])
+    assert fetched["metadata"]["string_key"] == "value"
+    assert fetched["metadata"]["number_key"] == 42
+    assert fetched["metadata"]["bool_key"] == True
+    assert fetched["metadata"]["nested"]["inner"] == "data"
 
 
-async def test_list_assistants_with_limit(async_client, assistant):
+async def test_list_assistants_with_limit(async_client, readonly_assistant):
     """Test listing assistants with limit parameter."""
     try:
         # LangGraph SDK uses search() with limit parameter
@@ -279,7 +261,7 @@ async def test_list_assistants_with_limit(async_client, assistant):
         pytest.skip("Limit parameter not supported in this SDK version")
 
 
-async def test_list_assistants_with_offset(async_client, assistant):
+async def test_list_assistants_with_offset(async_client, readonly_assistant):
     """Test listing assistants with offset/cursor pagination."""
     try:
         # Get all assistants first using search()
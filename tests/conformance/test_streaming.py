@@ -8,259 +8,310 @@ Note: These tests may skip if streaming is not fully implemented.
 """
 import pytest
 import asyncio
-
-
-pytestmark = pytest.mark.asyncio
+import math
+import operator
+from collections import deque
 
 # Timeout for streaming operations (in seconds)
 STREAM_TIMEOUT = 10
-
-
-async def collect_events_with_timeout(stream, timeout=STREAM_TIMEOUT, max_events=10):
-    """Collect streaming events with a timeout."""
-    events = []
+# Shorter wait for the first event, so a backend that never starts streaming
+# is detected quickly instead of after the full STREAM_TIMEOUT
+FIRST_EVENT_TIMEOUT = 2
+# Event types accepted as the final event of a completed stream
+COMPLETION_EVENTS = frozenset(("end", "done", "complete", "values", "metadata"))
+
+
+@pytest.fixture(scope="module")
+async def streaming_unsupported(async_client, readonly_assistant, created_ids):
+    """Probe run streaming once for the module.
+
+    Returns a skip reason only if the backend reports streaming as
+    unimplemented, else None, so streaming tests can skip instantly instead of
+    each failing the same way. A slow or empty first stream (e.g. on a cold
+    backend) is left for the individual tests to report.
+    """
+    thread = await async_client.threads.create()
+    created_ids["threads"].append(thread["thread_id"])
+    stream = async_client.runs.stream(
+        thread["thread_id"],
+        readonly_assistant["assistant_id"],
+        input={"message": "streaming probe"},
+        stream_mode="values"
+    )
     try:
-        async def collect():
-            async for event in stream:
+        async with asyncio.timeout(FIRST_EVENT_TIMEOUT):
+            await anext(stream)
+    except (StopAsyncIteration, TimeoutError):
+        pass
+    except Exception as e:
+        msg = str(e).lower()
+        if "not implemented" in msg or "501" in msg:
+            return "Streaming not implemented yet"
+        # Anything else is left for the individual tests to report
+    finally:
+        await stream.aclose()
+    return None
+
+
+@pytest.fixture(autouse=True)
+def require_streaming(streaming_unsupported):
+    """Skip before any per-test setup when the session probe found no streaming."""
+    if streaming_unsupported:
+        pytest.skip(streaming_unsupported)
+
+
+async def collect_events_with_timeout(stream, timeout=STREAM_TIMEOUT, max_events=10,
+                                      first_timeout=FIRST_EVENT_TIMEOUT, tail_only=False):
+    """Collect streaming events with a timeout.
+
+    Iterates under a single ``asyncio.timeout`` scope and returns as soon as
+    ``max_events`` arrive, closing the stream so the server stops producing
+    events we would discard. Raises ``TimeoutError`` if no event arrives
+    within ``first_timeout``; once streaming has started, a timeout just
+    returns the events collected so far. With ``tail_only``, only the last
+    event received is kept.
+    """
+    events = deque(maxlen=1) if tail_only else []
+    received = 0
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    first_wait = min(first_timeout, timeout)
+    it = stream.__aiter__()
+    try:
+        async with asyncio.timeout_at(loop.time() + first_wait) as cm:
+            async for event in it:
+                if not received:
+                    # Streaming has started: extend to the overall deadline
+                    cm.reschedule(deadline)
                 events.append(event)
-                if len(events) >= max_events:
+                received += 1
+                if received >= max_events:
                     break
-        await asyncio.wait_for(collect(), timeout=timeout)
-    except asyncio.TimeoutError:
-        pass  # Return whatever events we collected
-    return events
-
-
-async def test_stream_values_mode(async_client, assistant, thread):
-    """Test streaming with 'values' mode returns full state on each event."""
-    thread_id = thread["thread_id"]
-    assistant_id = assistant["assistant_id"]
-
+    except TimeoutError:
+        if not received:
+            raise TimeoutError(
+                f"Streaming timeout: no first event within {first_wait:.1f}s"
+            ) from None
+        # Otherwise return whatever events we collected
+    finally:
+        await _safe_aclose(it)
+    return list(events)
+
+
+async def _safe_aclose(stream):
+    """Close ``stream`` now rather than leaving its HTTP response open until GC."""
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        await aclose()
+    else:
+        getattr(stream, "close", lambda: None)()
+
+
+def _event_type_getter(probe):
+    """Return a callable reading the event type, chosen once from a sample event.
+
+    SDK stream parts expose ``.event``; raw dict events use an ``"event"`` key.
+    """
+    if hasattr(probe, "event"):
+        return operator.attrgetter("event")
+    if isinstance(probe, dict):
+        return operator.itemgetter("event")
+    return lambda _: None
+
+
+def _skip_if_unimplemented(exc, *hints, feature="Streaming mode"):
+    """Skip the test if ``exc`` signals an unimplemented or unsupported feature, else re-raise.
+
+    Timeouts are recognised by type; everything else is classified from a
+    single lowercased copy of the message. ``hints`` are extra lowercase
+    substrings that must all appear in it for it to count as "not supported".
+    """
+    if isinstance(exc, TimeoutError):
+        pytest.skip("Streaming timed out")
+    msg = str(exc).lower()
+    if "not implemented" in msg or "501" in msg:
+        pytest.skip(f"{feature} not implemented yet")
+    if hints and all(h in msg for h in hints):
+        pytest.skip(f"{feature} not supported")
+    if "timeout" in msg:
+        pytest.skip("Streaming timed out")
+    raise exc
+
+
+# Every stream_mode is requested in one run and events are partitioned by
+# type, so the backend executes the graph once instead of once per mode
+STREAM_MODES = ["values", "updates", "messages", "debug"]
+
+# The combined run is shared by the module, so keep its tests on one worker
+pytestmark = pytest.mark.xdist_group("streaming")
+
+
+@pytest.fixture(scope="module")
+async def all_modes_events(async_client, readonly_assistant, created_ids):
+    """Stream one run with every mode in STREAM_MODES and return its events.
+
+    Skips (for every test requesting it) when the backend or SDK can't stream
+    multiple modes at once; ``test_stream_single_mode`` uses that as its cue
+    to run.
+    """
+    thread = await async_client.threads.create()
+    created_ids["threads"].append(thread["thread_id"])
     try:
         stream = async_client.runs.stream(
-            thread_id,
-            assistant_id,
-            input={"message": "test streaming values"},
-            stream_mode="values"
+            thread["thread_id"],
+            readonly_assistant["assistant_id"],
+            input={"message": "test streaming all modes"},
+            stream_mode=STREAM_MODES
         )
-        events = await collect_events_with_timeout(stream)
+        events = await collect_events_with_timeout(stream, max_events=40)
+    except TypeError:
+        pytest.skip("Multiple stream modes not supported in this SDK version")
     except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("Streaming not implemented yet")
-        if "timeout" in str(e).lower():
-            pytest.skip("Streaming timed out - endpoint may not be fully implemented")
-        raise
+        _skip_if_unimplemented(e, "invalid", "mode")
 
     if len(events) == 0:
         pytest.skip("No streaming events received - streaming may not be implemented")
+    return events
 
-    # In values mode, events should contain full state values
-    values_events = [e for e in events if hasattr(e, 'event') and e.event == "values"]
-    for event in values_events:
-        if hasattr(event, 'data'):
-            assert "values" in event.data or isinstance(event.data, dict)
-
-
-async def test_stream_messages_mode(async_client, assistant, thread):
-    """Test streaming with 'messages' mode returns message updates."""
-    thread_id = thread["thread_id"]
-    assistant_id = assistant["assistant_id"]
 
-    try:
-        stream = async_client.runs.stream(
-            thread_id,
-            assistant_id,
-            input={"message": "test streaming messages"},
-            stream_mode="messages"
-        )
-        events = await collect_events_with_timeout(stream)
-    except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("Messages streaming mode not implemented yet")
-        if "invalid" in str(e).lower() and "mode" in str(e).lower():
-            pytest.skip("Messages streaming mode not supported")
-        if "timeout" in str(e).lower():
-            pytest.skip("Streaming timed out")
-        raise
-
-    if len(events) == 0:
-        pytest.skip("No streaming events received")
+async def test_stream_all_modes(all_modes_events):
+    """Test streaming with all stream modes combined in a single run."""
+    events = all_modes_events
 
+    # Partition by mode; messages events arrive as e.g. "messages/partial"
+    by_mode = {}
+    for event, event_type in zip(events, map(_event_type_getter(events[0]), events)):
+        mode = event_type.split("/", 1)[0] if event_type else None
+        by_mode.setdefault(mode, []).append(event)
 
-async def test_stream_updates_mode(async_client, assistant, thread):
-    """Test streaming with 'updates' mode returns state diffs."""
-    thread_id = thread["thread_id"]
-    assistant_id = assistant["assistant_id"]
-
-    try:
-        stream = async_client.runs.stream(
-            thread_id,
-            assistant_id,
-            input={"message": "test streaming updates"},
-            stream_mode="updates"
-        )
-        events = await collect_events_with_timeout(stream)
-    except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("Updates streaming mode not implemented yet")
-        if "invalid" in str(e).lower() and "mode" in str(e).lower():
-            pytest.skip("Updates streaming mode not supported")
-        if "timeout" in str(e).lower():
-            pytest.skip("Streaming timed out")
-        raise
+    # Values events should contain full state values
+    for event in by_mode.get("values", ()):
+        if hasattr(event, 'data'):
+            assert "values" in event.data or isinstance(event.data, dict)
 
-    if len(events) == 0:
-        pytest.skip("No streaming events received")
+    # messages and debug are optional; values and updates are core modes
+    for mode in ("values", "updates"):
+        assert by_mode.get(mode), f"No '{mode}' events received in multi-mode stream"
 
 
-async def test_stream_debug_mode(async_client, assistant, thread):
-    """Test streaming with 'debug' mode returns detailed execution info."""
-    thread_id = thread["thread_id"]
-    assistant_id = assistant["assistant_id"]
+@pytest.fixture
+def single_mode_runctx(request):
+    """Return a ``runctx`` only when the combined all-modes run was skipped.
 
+    Otherwise that run already covered every mode, so the test skips before
+    creating an assistant and thread of its own.
+    """
     try:
-        stream = async_client.runs.stream(
-            thread_id,
-            assistant_id,
-            input={"message": "test streaming debug"},
-            stream_mode="debug"
-        )
-        events = await collect_events_with_timeout(stream)
-    except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("Debug streaming mode not implemented yet")
-        if "invalid" in str(e).lower() and "mode" in str(e).lower():
-            pytest.skip("Debug streaming mode not supported")
-        if "timeout" in str(e).lower():
-            pytest.skip("Streaming timed out")
-        raise
-
-    # Debug mode is optional, so we just verify it doesn't error
-    if len(events) == 0:
-        pytest.skip("No streaming events received")
+        request.getfixturevalue("all_modes_events")
+    except pytest.skip.Exception:
+        return request.getfixturevalue("runctx")
+    pytest.skip("Covered by test_stream_all_modes")
 
 
-async def test_stream_multiple_modes(async_client, assistant, thread):
-    """Test streaming with multiple modes simultaneously."""
-    thread_id = thread["thread_id"]
-    assistant_id = assistant["assistant_id"]
-
+@pytest.mark.parametrize("mode", STREAM_MODES)
+async def test_stream_single_mode(single_mode_runctx, mode):
+    """Test streaming with a single stream mode, where multi-mode streaming is unavailable."""
+    runctx = single_mode_runctx
     try:
-        stream = async_client.runs.stream(
-            thread_id,
-            assistant_id,
-            input={"message": "test multiple modes"},
-            stream_mode=["values", "updates"]
+        stream = runctx.client.runs.stream(
+            runctx.thread_id,
+            runctx.assistant_id,
+            input={"message": f"test streaming {mode}"},
+            stream_mode=mode
         )
         events = await collect_events_with_timeout(stream)
-    except TypeError:
-        pytest.skip("Multiple stream modes not supported in this SDK version")
     except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("Multiple streaming modes not implemented yet")
-        if "timeout" in str(e).lower():
-            pytest.skip("Streaming timed out")
-        raise
+        _skip_if_unimplemented(e, "invalid", "mode", feature=f"{mode!r} streaming mode")
 
     if len(events) == 0:
         pytest.skip("No streaming events received")
 
+    # Values events should contain full state values
+    if mode == "values":
+        get_type = _event_type_getter(events[0])
+        for event in events:
+            if get_type(event) == "values" and hasattr(event, 'data'):
+                assert "values" in event.data or isinstance(event.data, dict)
 
-async def test_stream_events_order(async_client, assistant, thread):
-    """Test that streaming events arrive in correct order."""
-    thread_id = thread["thread_id"]
-    assistant_id = assistant["assistant_id"]
 
+async def test_stream_events_order(runctx):
+    """Test that streaming events arrive in correct order."""
     try:
-        stream = async_client.runs.stream(
-            thread_id,
-            assistant_id,
+        stream = runctx.client.runs.stream(
+            runctx.thread_id,
+            runctx.assistant_id,
             input={"message": "test event order"},
             stream_mode="values"
         )
-        events = await collect_events_with_timeout(stream)
+        events = await collect_events_with_timeout(stream, max_events=1)
     except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("Streaming not implemented yet")
-        if "timeout" in str(e).lower():
-            pytest.skip("Streaming timed out")
-        raise
+        _skip_if_unimplemented(e, feature="Streaming")
 
     if len(events) == 0:
         pytest.skip("No events received")
 
     # Check for metadata/start event at beginning
-    event_types = [getattr(e, 'event', None) for e in events]
+    event_types = list(map(_event_type_getter(events[0]), events))
 
     # Should have some structure - either metadata first or values events
     assert any(t is not None for t in event_types), "Events should have event type"
 
 
 @pytest.mark.skip(reason="Streaming event types need alignment with LangGraph SDK expectations")
-async def test_stream_completion_event(async_client, assistant, thread):
+async def test_stream_completion_event(runctx):
     """Test that streaming ends with a completion event."""
-    thread_id = thread["thread_id"]
-    assistant_id = assistant["assistant_id"]
-
     try:
-        stream = async_client.runs.stream(
-            thread_id,
-            assistant_id,
+        stream = runctx.client.runs.stream(
+            runctx.thread_id,
+            runctx.assistant_id,
             input={"message": "test completion"},
             stream_mode="values"
         )
-        events = await collect_events_with_timeout(stream)
+        events = await collect_events_with_timeout(stream, max_events=math.inf, tail_only=True)
     except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("Streaming not implemented yet")
-        if "timeout" in str(e).lower():
-            pytest.skip("Streaming timed out")
-        raise
+        _skip_if_unimplemented(e, feature="Streaming")
 
     if len(events) == 0:
         pytest.skip("No events received")
 
     # Last event should indicate completion (end, done, or final values)
     last_event = events[-1]
-    event_type = getattr(last_event, 'event', None)
+    event_type = _event_type_getter(last_event)(last_event)
 
     # Various completion indicators are acceptable
-    completion_indicators = ['end', 'done', 'complete', 'values', 'metadata']
-    assert event_type in completion_indicators or event_type is None
+    assert event_type in COMPLETION_EVENTS or event_type is None
 
 
-@pytest.mark.skip(reason="runs.join returns coroutine instead of async iterable")
-async def test_join_thread_stream(async_client, assistant, thread):
+async def test_join_thread_stream(runctx):
     """Test joining an existing thread stream mid-execution."""
-    thread_id = thread["thread_id"]
-    assistant_id = assistant["assistant_id"]
-
     # Start a run
-    run = await async_client.runs.create(
-        thread_id=thread_id,
-        assistant_id=assistant_id,
+    run = await runctx.client.runs.create(
+        thread_id=runctx.thread_id,
+        assistant_id=runctx.assistant_id,
         input={"message": "test join stream"}
     )
     run_id = run["run_id"]
 
-    # Try to join the stream (may already be complete for fast runs)
+    # Join the run's event stream (may already be complete for fast runs);
+    # runs.join only awaits the final state, join_stream yields its events
     try:
-        stream = async_client.runs.join(thread_id, run_id)
-        events = await collect_events_with_timeout(stream, timeout=5)
+        stream = runctx.client.runs.join_stream(runctx.thread_id, run_id)
+        events = await collect_events_with_timeout(stream)
     except AttributeError:
-        pytest.skip("runs.join not available in this SDK version")
+        pytest.skip("runs.join_stream not available in this SDK version")
     except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("Join stream not implemented yet")
-        if "not found" in str(e).lower() or "404" in str(e):
-            # Run may have completed before we could join
-            pass
-        elif "timeout" in str(e).lower():
-            pass  # Timeout is acceptable
-        else:
-            raise
+        # Run may have completed before we could join, and a timeout is
+        # acceptable; anything else must be an unimplemented feature
+        msg = str(e).lower()
+        if "not found" in msg or "404" in msg or "timeout" in msg:
+            pytest.skip("Run finished before its stream could be joined")
+        _skip_if_unimplemented(e, feature="Join stream")
 
-    # Events received or run already completed - both are valid
+    if len(events) == 0:
+        pytest.skip("Run finished before its stream could be joined")
+
+    event_types = list(map(_event_type_getter(events[0]), events))
+    assert any(t is not None for t in event_types), "Events should have event type"
 
 
 @pytest.mark.skip(reason="runs.stream returns coroutine instead of async iterable for stateless mode")
@@ -279,48 +330,32 @@ async def test_stateless_stream(async_client, assistant):
     except TypeError:
         pytest.skip("Stateless streaming not supported in this SDK version")
     except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("Stateless streaming not implemented yet")
-        if "thread" in str(e).lower() and "required" in str(e).lower():
-            pytest.skip("Thread is required for streaming in this implementation")
-        if "timeout" in str(e).lower():
-            pytest.skip("Streaming timed out")
-        raise
+        _skip_if_unimplemented(e, "thread", "required", feature="Stateless streaming")
 
 
-async def test_stream_with_config(async_client, assistant, thread):
+async def test_stream_with_config(runctx):
     """Test streaming with additional config options."""
-    thread_id = thread["thread_id"]
-    assistant_id = assistant["assistant_id"]
-
     try:
-        stream = async_client.runs.stream(
-            thread_id,
-            assistant_id,
+        stream = runctx.client.runs.stream(
+            runctx.thread_id,
+            runctx.assistant_id,
             input={"message": "test with config"},
             stream_mode="values",
             config={"configurable": {"model": "test"}}
         )
-        events = await collect_events_with_timeout(stream)
+        events = await collect_events_with_timeout(stream, max_events=1)
     except TypeError:
         pytest.skip("Config parameter not supported in this SDK version")
     except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("Streaming with config not implemented yet")
-        if "timeout" in str(e).lower():
-            pytest.skip("Streaming timed out")
-        raise
+        _skip_if_unimplemented(e, feature="Streaming with config")
 
 
-async def test_stream_interrupt_before(async_client, assistant, thread):
+async def test_stream_interrupt_before(runctx):
     """Test streaming with interrupt_before parameter."""
-    thread_id = thread["thread_id"]
-    assistant_id = assistant["assistant_id"]
-
     try:
-        stream = async_client.runs.stream(
-            thread_id,
-            assistant_id,
+        stream = runctx.client.runs.stream(
+            runctx.thread_id,
+            runctx.assistant_id,
             input={"message": "test interrupt"},
             stream_mode="values",
             interrupt_before=["*"]  # Interrupt before any node
@@ -329,10 +364,6 @@ async def test_stream_interrupt_before(async_client, assistant, thread):
     except TypeError:
         pytest.skip("interrupt_before parameter not supported")
     except Exception as e:
-        if "not implemented" in str(e).lower() or "501" in str(e):
-            pytest.skip("interrupt_before not implemented yet")
-        if "timeout" in str(e).lower():
-            pytest.skip("Streaming timed out")
-        raise
+        _skip_if_unimplemented(e, feature="interrupt_before")
 
     # Should receive events up to interrupt point
@@ -6,9 +6,15 @@ DuraGraph compatibility with LangGraph Cloud API.
 """
 import pytest
 import asyncio
+import inspect
 
+from langgraph_sdk.client import ThreadsClient
 
-pytestmark = pytest.mark.asyncio
+# Optional SDK features, detected once at import so unsupported tests skip
+# before their fixtures (thread creation, seeding runs) are set up
+HAS_COPY = hasattr(ThreadsClient, "copy")
+HAS_HISTORY_LIMIT = "limit" in inspect.signature(ThreadsClient.get_history).parameters
+HAS_CHECKPOINT_ID = "checkpoint_id" in inspect.signature(ThreadsClient.get_state).parameters
 
 
 async def test_get_thread_state(async_client, thread_with_state):
@@ -43,9 +49,10 @@ async def test_get_thread_state_empty_thread(async_client, thread):
         raise
 
 
-async def test_update_thread_state(async_client, thread):
+@pytest.mark.xdist_group("updatable_thread")
+async def test_update_thread_state(async_client, updatable_thread):
     """Test updating thread state."""
-    thread_id = thread["thread_id"]
+    thread_id = updatable_thread["thread_id"]
 
     # Update thread state with new values
     result = await async_client.threads.update_state(
@@ -59,9 +66,10 @@ async def test_update_thread_state(async_client, thread):
     assert state["values"].get("counter") == 42
 
 
-async def test_update_thread_state_with_as_node(async_client, thread):
+@pytest.mark.xdist_group("updatable_thread")
+async def test_update_thread_state_with_as_node(async_client, updatable_thread):
     """Test updating thread state with as_node parameter."""
-    thread_id = thread["thread_id"]
+    thread_id = updatable_thread["thread_id"]
 
     # Update state as if from a specific node
     try:
@@ -103,19 +111,17 @@ async def test_get_thread_history_empty(async_client, thread):
     assert isinstance(history, list)
 
 
+@pytest.mark.skipif(not HAS_HISTORY_LIMIT, reason="History limit parameter not supported in this SDK version")
 async def test_get_thread_history_with_limit(async_client, thread_with_state):
     """Test getting thread history with limit parameter."""
     thread_id = thread_with_state["thread_id"]
 
-    try:
-        history = await async_client.threads.get_history(thread_id, limit=5)
-        assert isinstance(history, list)
-        assert len(history) <= 5
-    except TypeError:
-        # SDK version may not support limit parameter
-        pytest.skip("History limit parameter not supported in this SDK version")
+    history = await async_client.threads.get_history(thread_id, limit=5)
+    assert isinstance(history, list)
+    assert len(history) <= 5
 
 
+@pytest.mark.skipif(not HAS_CHECKPOINT_ID, reason="checkpoint_id parameter not supported in this SDK version")
 async def test_get_state_at_checkpoint(async_client, thread_with_state):
     """Test getting state at a specific checkpoint."""
     thread_id = thread_with_state["thread_id"]
@@ -131,31 +137,35 @@ async def test_get_state_at_checkpoint(async_client, thread_with_state):
         pytest.skip("No checkpoint_id in state")
 
     # Get state at that specific checkpoint
-    try:
-        historical_state = await async_client.threads.get_state(
-            thread_id,
-            checkpoint_id=checkpoint_id
-        )
-        assert "values" in historical_state
-    except TypeError:
-        # SDK version may not support checkpoint_id parameter
-        pytest.skip("checkpoint_id parameter not supported in this SDK version")
+    historical_state = await async_client.threads.get_state(
+        thread_id,
+        checkpoint_id=checkpoint_id
+    )
+    assert "values" in historical_state
 
 
-async def test_thread_state_persistence(async_client, thread):
-    """Test that thread state persists across multiple updates."""
+@pytest.mark.parametrize("batched", [True, False], ids=["batched", "sequential"])
+async def test_thread_state_persistence(async_client, thread, batched):
+    """Test that thread state persists across one batched or multiple sequential updates."""
     thread_id = thread["thread_id"]
 
-    # Make multiple updates
-    await async_client.threads.update_state(
-        thread_id,
-        values={"step1": "value1"}
-    )
+    if batched:
+        # One round-trip carrying both values
+        await async_client.threads.update_state(
+            thread_id,
+            values={"step1": "value1", "step2": "value2"}
+        )
+    else:
+        # Make multiple updates
+        await async_client.threads.update_state(
+            thread_id,
+            values={"step1": "value1"}
+        )
 
-    await async_client.threads.update_state(
-        thread_id,
-        values={"step2": "value2"}
-    )
+        await async_client.threads.update_state(
+            thread_id,
+            values={"step2": "value2"}
+        )
 
     # Get final state
     state = await async_client.threads.get_state(thread_id)
@@ -165,7 +175,8 @@ async def test_thread_state_persistence(async_client, thread):
     assert "step1" in state["values"] or "step2" in state["values"]
 
 
-async def test_copy_thread(async_client, thread_with_state):
+@pytest.mark.skipif(not HAS_COPY, reason="threads.copy not available in this SDK version")
+async def test_copy_thread(async_client, thread_with_state, created_ids):
     """Test copying a thread with its state."""
     thread_id = thread_with_state["thread_id"]
 
@@ -175,6 +186,7 @@ async def test_copy_thread(async_client, thread_with_state):
     # Copy the thread
     try:
         new_thread = await async_client.threads.copy(thread_id)
+        created_ids["threads"].append(new_thread["thread_id"])
 
         assert "thread_id" in new_thread
         assert new_thread["thread_id"] != thread_id
@@ -183,11 +195,6 @@ async def test_copy_thread(async_client, thread_with_state):
         new_state = await async_client.threads.get_state(new_thread["thread_id"])
         assert new_state["values"] == original_state["values"]
 
-        # Cleanup
-        await async_client.threads.delete(new_thread["thread_id"])
-
-    except AttributeError:
-        pytest.skip("threads.copy not available in this SDK version")
     except Exception as e:
         if "not implemented" in str(e).lower() or "501" in str(e):
             pytest.skip("Thread copy not implemented yet")
@@ -3,21 +3,51 @@
 Tests the full flow: worker registration, heartbeat, polling, task execution.
 """
 
+import asyncio
 import os
 import time
 import uuid
 
 import httpx
 import pytest
+import pytest_asyncio
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8081/api/v1")
 TIMEOUT = 30.0
 
-
-@pytest.fixture
-def api_client():
-    """Create HTTP client for API requests."""
-    with httpx.Client(base_url=API_BASE_URL, timeout=TIMEOUT) as client:
+# Canonical registration pieces, built once and shared by the tests
+CAPABILITIES = {
+    "graphs": ["simple_echo"],
+    "max_concurrent_runs": 5,
+}
+SIMPLE_ECHO_DEFINITION = {
+    "graph_id": "simple_echo",
+    "name": "Simple Echo",
+    "description": "Echoes input back",
+    "nodes": [
+        {"id": "start", "type": "input"},
+        {"id": "echo", "type": "llm"},
+        {"id": "end", "type": "output"},
+    ],
+    "edges": [
+        {"source": "start", "target": "echo"},
+        {"source": "echo", "target": "end"},
+    ],
+    "entry_point": "start",
+}
+
+# Every test shares the session's event loop so they can share one client
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def api_client():
+    """Create one async HTTP client whose connection pool is shared by all tests."""
+    async with httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        timeout=TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=32),
+    ) as client:
         yield client
 
 
@@ -27,12 +57,29 @@ def worker_id():
     return f"test-worker-{uuid.uuid4().hex[:8]}"
 
 
+@pytest_asyncio.fixture(scope="class", loop_scope="session")
+async def registered_worker(api_client):
+    """Register one worker shared by a test class and deregister it afterwards."""
+    worker_id = f"test-worker-{uuid.uuid4().hex[:8]}"
+    response = await api_client.post(
+        "/workers/register",
+        json={
+            "worker_id": worker_id,
+            "name": "Test Worker",
+            "capabilities": CAPABILITIES,
+        },
+    )
+    response.raise_for_status()
+    yield worker_id
+    await api_client.post(f"/workers/{worker_id}/deregister")
+
+
 class TestWorkerRegistration:
     """Tests for worker registration endpoint."""
 
-    def test_register_worker(self, api_client, worker_id):
+    async def test_register_worker(self, api_client, worker_id):
         """Test that a worker can register with the control plane."""
-        response = api_client.post(
+        response = await api_client.post(
             "/workers/register",
             json={
                 "worker_id": worker_id,
@@ -41,23 +88,7 @@ class TestWorkerRegistration:
                     "graphs": ["simple_echo", "multi_step"],
                     "max_concurrent_runs": 5,
                 },
-                "graph_definitions": [
-                    {
-                        "graph_id": "simple_echo",
-                        "name": "Simple Echo",
-                        "description": "Echoes input back",
-                        "nodes": [
-                            {"id": "start", "type": "input"},
-                            {"id": "echo", "type": "llm"},
-                            {"id": "end", "type": "output"},
-                        ],
-                        "edges": [
-                            {"source": "start", "target": "echo"},
-                            {"source": "echo", "target": "end"},
-                        ],
-                        "entry_point": "start",
-                    }
-                ],
+                "graph_definitions": [SIMPLE_ECHO_DEFINITION],
             },
         )
 
@@ -69,9 +100,9 @@ class TestWorkerRegistration:
         assert "poll_url" in data
         assert "deregister_url" in data
 
-    def test_register_worker_without_id_fails(self, api_client):
+    async def test_register_worker_without_id_fails(self, api_client):
         """Test that registration without worker_id fails."""
-        response = api_client.post(
+        response = await api_client.post(
             "/workers/register",
             json={
                 "name": "Test Worker",
@@ -88,24 +119,11 @@ class TestWorkerRegistration:
 class TestWorkerHeartbeat:
     """Tests for worker heartbeat endpoint."""
 
-    def test_heartbeat_success(self, api_client, worker_id):
+    async def test_heartbeat_success(self, api_client, registered_worker):
         """Test that a registered worker can send heartbeats."""
-        # First register
-        api_client.post(
-            "/workers/register",
-            json={
-                "worker_id": worker_id,
-                "name": "Test Worker",
-                "capabilities": {
-                    "graphs": ["simple_echo"],
-                    "max_concurrent_runs": 5,
-                },
-            },
-        )
-
         # Send heartbeat
-        response = api_client.post(
-            f"/workers/{worker_id}/heartbeat",
+        response = await api_client.post(
+            f"/workers/{registered_worker}/heartbeat",
             json={
                 "status": "ready",
                 "active_runs": 0,
@@ -118,9 +136,9 @@ class TestWorkerHeartbeat:
         data = response.json()
         assert data["acknowledged"] is True
 
-    def test_heartbeat_unknown_worker(self, api_client):
+    async def test_heartbeat_unknown_worker(self, api_client):
         """Test that heartbeat for unknown worker returns 404."""
-        response = api_client.post(
+        response = await api_client.post(
             "/workers/unknown-worker-123/heartbeat",
             json={
                 "status": "ready",
@@ -136,24 +154,11 @@ class TestWorkerHeartbeat:
 class TestWorkerPolling:
     """Tests for worker polling endpoint."""
 
-    def test_poll_empty(self, api_client, worker_id):
+    async def test_poll_empty(self, api_client, registered_worker):
         """Test that polling returns empty when no tasks available."""
-        # First register
-        api_client.post(
-            "/workers/register",
-            json={
-                "worker_id": worker_id,
-                "name": "Test Worker",
-                "capabilities": {
-                    "graphs": ["simple_echo"],
-                    "max_concurrent_runs": 5,
-                },
-            },
-        )
-
         # Poll for tasks
-        response = api_client.post(
-            f"/workers/{worker_id}/poll",
+        response = await api_client.post(
+            f"/workers/{registered_worker}/poll",
             json={"max_tasks": 5},
         )
 
@@ -161,9 +166,9 @@ class TestWorkerPolling:
         data = response.json()
         assert data["tasks"] == []
 
-    def test_poll_unknown_worker(self, api_client):
+    async def test_poll_unknown_worker(self, api_client):
         """Test that polling for unknown worker returns 404."""
-        response = api_client.post(
+        response = await api_client.post(
             "/workers/unknown-worker-123/poll",
             json={"max_tasks": 1},
         )
@@ -174,23 +179,20 @@ class TestWorkerPolling:
 class TestWorkerDeregistration:
     """Tests for worker deregistration endpoint."""
 
-    def test_deregister_worker(self, api_client, worker_id):
+    async def test_deregister_worker(self, api_client, worker_id):
         """Test that a worker can deregister."""
         # First register
-        api_client.post(
+        await api_client.post(
             "/workers/register",
             json={
                 "worker_id": worker_id,
                 "name": "Test Worker",
-                "capabilities": {
-                    "graphs": ["simple_echo"],
-                    "max_concurrent_runs": 5,
-                },
+                "capabilities": CAPABILITIES,
             },
         )
 
         # Deregister
-        response = api_client.post(f"/workers/{worker_id}/deregister")
+        response = await api_client.post(f"/workers/{worker_id}/deregister")
 
         assert response.status_code == 200
         data = response.json()
@@ -198,12 +200,12 @@ class TestWorkerDeregistration:
         assert data["deregistered"] is True
 
         # Verify worker is gone
-        response = api_client.get(f"/workers/{worker_id}")
+        response = await api_client.get(f"/workers/{worker_id}")
         assert response.status_code == 404
 
-    def test_deregister_unknown_worker(self, api_client):
+    async def test_deregister_unknown_worker(self, api_client):
         """Test that deregistering unknown worker still returns OK."""
-        response = api_client.post("/workers/unknown-worker-123/deregister")
+        response = await api_client.post("/workers/unknown-worker-123/deregister")
 
         assert response.status_code == 200
         data = response.json()
@@ -213,63 +215,37 @@ class TestWorkerDeregistration:
 class TestWorkerListing:
     """Tests for worker listing endpoint."""
 
-    def test_list_workers(self, api_client, worker_id):
+    async def test_list_workers(self, api_client, registered_worker):
         """Test that registered workers appear in listing."""
-        # Register a worker
-        api_client.post(
-            "/workers/register",
-            json={
-                "worker_id": worker_id,
-                "name": "Test Worker",
-                "capabilities": {
-                    "graphs": ["simple_echo"],
-                    "max_concurrent_runs": 5,
-                },
-            },
-        )
-
         # List workers
-        response = api_client.get("/workers")
+        response = await api_client.get("/workers")
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] >= 1
 
         worker_ids = [w["worker_id"] for w in data["workers"]]
-        assert worker_id in worker_ids
+        assert registered_worker in worker_ids
 
-    def test_list_healthy_workers(self, api_client, worker_id):
+    async def test_list_healthy_workers(self, api_client, registered_worker):
         """Test filtering by healthy workers."""
-        # Register a worker
-        api_client.post(
-            "/workers/register",
-            json={
-                "worker_id": worker_id,
-                "name": "Test Worker",
-                "capabilities": {
-                    "graphs": ["simple_echo"],
-                    "max_concurrent_runs": 5,
-                },
-            },
-        )
-
         # List healthy workers (worker just registered, should be healthy)
-        response = api_client.get("/workers", params={"healthy": "true"})
+        response = await api_client.get("/workers", params={"healthy": "true"})
 
         assert response.status_code == 200
         data = response.json()
 
         worker_ids = [w["worker_id"] for w in data["workers"]]
-        assert worker_id in worker_ids
+        assert registered_worker in worker_ids
 
 
 class TestGraphDefinitions:
     """Tests for graph definition retrieval."""
 
-    def test_get_graph_definition(self, api_client, worker_id):
+    async def test_get_graph_definition(self, api_client, worker_id):
         """Test that graph definitions can be retrieved."""
         # Register worker with graph definition
-        api_client.post(
+        await api_client.post(
             "/workers/register",
             json={
                 "worker_id": worker_id,
@@ -297,7 +273,7 @@ class TestGraphDefinitions:
         )
 
         # Get graph definition
-        response = api_client.get("/workers/graphs/test_graph")
+        response = await api_client.get("/workers/graphs/test_graph")
 
         assert response.status_code == 200
         data = response.json()
@@ -306,9 +282,9 @@ class TestGraphDefinitions:
         assert len(data["nodes"]) == 2
         assert len(data["edges"]) == 1
 
-    def test_get_unknown_graph(self, api_client):
+    async def test_get_unknown_graph(self, api_client):
         """Test that unknown graph returns 404."""
-        response = api_client.get("/workers/graphs/unknown_graph")
+        response = await api_client.get("/workers/graphs/unknown_graph")
 
         assert response.status_code == 404
 
@@ -316,24 +292,11 @@ class TestGraphDefinitions:
 class TestWorkerEvents:
     """Tests for worker event streaming."""
 
-    def test_send_event(self, api_client, worker_id):
+    async def test_send_event(self, api_client, registered_worker):
         """Test that workers can send events."""
-        # Register worker
-        api_client.post(
-            "/workers/register",
-            json={
-                "worker_id": worker_id,
-                "name": "Test Worker",
-                "capabilities": {
-                    "graphs": ["simple_echo"],
-                    "max_concurrent_runs": 5,
-                },
-            },
-        )
-
         # Send event
-        response = api_client.post(
-            f"/workers/{worker_id}/events",
+        response = await api_client.post(
+            f"/workers/{registered_worker}/events",
             json={
                 "run_id": str(uuid.uuid4()),
                 "event_type": "node_started",
@@ -351,44 +314,65 @@ class TestWorkerEvents:
 class TestFullWorkflow:
     """Integration tests for full worker workflow."""
 
-    def test_worker_lifecycle(self, api_client, worker_id):
-        """Test complete worker lifecycle: register -> heartbeat -> poll -> deregister."""
+    async def test_worker_lifecycle(self, api_client, worker_id):
+        """Test complete worker lifecycle: register -> heartbeat -> poll -> deregister.
+
+        Steps run in causal phases; only steps within a phase may overlap:
+
+        1. register
+        2. ready heartbeat, poll, listing, event (all need only a registered worker)
+        3. running heartbeat (must land after the ready one)
+        4. verify status
+        5. deregister
+        6. verify worker is gone
+        """
         # 1. Register
-        response = api_client.post(
+        response = await api_client.post(
             "/workers/register",
             json={
                 "worker_id": worker_id,
                 "name": "Lifecycle Test Worker",
-                "capabilities": {
-                    "graphs": ["simple_echo"],
-                    "max_concurrent_runs": 5,
-                },
-            },
-        )
-        assert response.status_code == 200
-
-        # 2. Send heartbeat
-        response = api_client.post(
-            f"/workers/{worker_id}/heartbeat",
-            json={
-                "status": "ready",
-                "active_runs": 0,
-                "total_runs": 0,
-                "failed_runs": 0,
+                "capabilities": CAPABILITIES,
             },
         )
         assert response.status_code == 200
 
-        # 3. Poll for tasks
-        response = api_client.post(
-            f"/workers/{worker_id}/poll",
-            json={"max_tasks": 5},
+        # 2. Send heartbeat, poll for tasks, list workers and send an event
+        heartbeat, poll, listing, event = await asyncio.gather(
+            api_client.post(
+                f"/workers/{worker_id}/heartbeat",
+                json={
+                    "status": "ready",
+                    "active_runs": 0,
+                    "total_runs": 0,
+                    "failed_runs": 0,
+                },
+            ),
+            api_client.post(
+                f"/workers/{worker_id}/poll",
+                json={"max_tasks": 5},
+            ),
+            api_client.get("/workers"),
+            api_client.post(
+                f"/workers/{worker_id}/events",
+                json={
+                    "run_id": str(uuid.uuid4()),
+                    "event_type": "node_started",
+                    "node_id": "echo",
+                    "data": {},
+                    "timestamp": "2025-01-15T10:00:00Z",
+                },
+            ),
         )
-        assert response.status_code == 200
-        assert response.json()["tasks"] == []
-
-        # 4. Update status via heartbeat
-        response = api_client.post(
+        assert heartbeat.status_code == 200
+        assert poll.status_code == 200
+        assert poll.json()["tasks"] == []
+        assert listing.status_code == 200
+        assert worker_id in [w["worker_id"] for w in listing.json()["workers"]]
+        assert event.status_code == 200
+
+        # 3. Update status via heartbeat
+        response = await api_client.post(
             f"/workers/{worker_id}/heartbeat",
             json={
                 "status": "running",
@@ -399,18 +383,18 @@ class TestFullWorkflow:
         )
         assert response.status_code == 200
 
-        # 5. Verify worker status
-        response = api_client.get(f"/workers/{worker_id}")
+        # 4. Verify worker status
+        response = await api_client.get(f"/workers/{worker_id}")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "running"
         assert data["active_runs"] == 1
         assert data["total_runs"] == 1
 
-        # 6. Deregister
-        response = api_client.post(f"/workers/{worker_id}/deregister")
+        # 5. Deregister
+        response = await api_client.post(f"/workers/{worker_id}/deregister")
         assert response.status_code == 200
 
-        # 7. Verify worker is gone
-        response = api_client.get(f"/workers/{worker_id}")
+        # 6. Verify worker is gone
+        response = await api_client.get(f"/workers/{worker_id}")
         assert response.status_code == 404
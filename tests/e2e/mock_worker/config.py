@@ -1,77 +1,66 @@
 """Mock worker configuration."""
 
-from pydantic_settings import BaseSettings
-from pydantic import Field
+import os
+from dataclasses import dataclass
 from typing import Optional
 
 
-class Config(BaseSettings):
+@dataclass(frozen=True, slots=True)
+class Config:
     """Mock worker configuration from environment variables."""
 
     # Control plane connection
-    control_plane_url: str = Field(
-        default="http://localhost:8081",
-        description="Control plane API URL",
-    )
+    control_plane_url: str = "http://localhost:8081"
 
     # Worker identity
-    worker_id: Optional[str] = Field(
-        default=None,
-        description="Worker ID (auto-generated if not provided)",
-    )
-    worker_name: str = Field(
-        default="mock-worker",
-        description="Worker name for identification",
-    )
+    worker_id: Optional[str] = None  # Auto-generated if not provided
+    worker_name: str = "mock-worker"
 
     # Graph configuration
-    mock_graph: str = Field(
-        default="simple_echo",
-        alias="MOCK_WORKER_GRAPH",
-        description="Which graph pattern to use",
-    )
-    mock_delay_ms: int = Field(
-        default=100,
-        alias="MOCK_WORKER_DELAY_MS",
-        description="Delay between nodes in milliseconds",
-    )
-    mock_fail_at_node: Optional[str] = Field(
-        default=None,
-        alias="MOCK_WORKER_FAIL_AT_NODE",
-        description="Node to fail at (for testing errors)",
-    )
-    mock_interrupt_at_node: Optional[str] = Field(
-        default=None,
-        alias="MOCK_WORKER_INTERRUPT_AT_NODE",
-        description="Node to interrupt at (for testing human-in-loop)",
-    )
-    mock_token_count: int = Field(
-        default=100,
-        alias="MOCK_WORKER_TOKEN_COUNT",
-        description="Simulated token count per LLM call",
-    )
+    mock_graph: str = "simple_echo"  # Which graph pattern to use
+    mock_delay_ms: int = 100  # Delay between nodes in milliseconds
+    mock_fail_at_node: Optional[str] = None  # Node to fail at (for testing errors)
+    mock_interrupt_at_node: Optional[str] = None  # Node to interrupt at (human-in-loop)
+    mock_token_count: int = 100  # Simulated token count per LLM call
 
     # Worker behavior
-    heartbeat_interval_seconds: int = Field(
-        default=10,
-        description="Heartbeat interval in seconds",
-    )
-    max_concurrent_runs: int = Field(
-        default=5,
-        description="Maximum concurrent runs this worker handles",
-    )
+    heartbeat_interval_seconds: int = 10
+    max_concurrent_runs: int = 5
+    max_messages_per_run: int = 1000  # Oldest messages are dropped beyond this
+    max_events_per_run: int = 10000  # Oldest events are dropped beyond this
 
     # Logging
-    log_level: str = Field(
-        default="INFO",
-        description="Log level",
-    )
+    log_level: str = "INFO"
+
 
-    model_config = {
-        "env_prefix": "",
-        "env_file": ".env",
-        "extra": "ignore",
-    }
+def _load_config_from_env() -> Config:
+    """Build a Config from the environment, falling back to the field defaults."""
+    env = os.environ
+    defaults = Config()
+    max_events_per_run = int(env.get("MAX_EVENTS_PER_RUN", defaults.max_events_per_run))
+    if max_events_per_run < 1:
+        raise ValueError(f"MAX_EVENTS_PER_RUN must be at least 1, got {max_events_per_run}")
+    return Config(
+        control_plane_url=env.get("CONTROL_PLANE_URL", defaults.control_plane_url),
+        worker_id=env.get("WORKER_ID", defaults.worker_id),
+        worker_name=env.get("WORKER_NAME", defaults.worker_name),
+        mock_graph=env.get("MOCK_WORKER_GRAPH", defaults.mock_graph),
+        mock_delay_ms=int(env.get("MOCK_WORKER_DELAY_MS", defaults.mock_delay_ms)),
+        mock_fail_at_node=env.get("MOCK_WORKER_FAIL_AT_NODE", defaults.mock_fail_at_node),
+        mock_interrupt_at_node=env.get(
+            "MOCK_WORKER_INTERRUPT_AT_NODE", defaults.mock_interrupt_at_node
+        ),
+        mock_token_count=int(env.get("MOCK_WORKER_TOKEN_COUNT", defaults.mock_token_count)),
+        heartbeat_interval_seconds=int(
+            env.get("HEARTBEAT_INTERVAL_SECONDS", defaults.heartbeat_interval_seconds)
+        ),
+        max_concurrent_runs=int(env.get("MAX_CONCURRENT_RUNS", defaults.max_concurrent_runs)),
+        max_messages_per_run=int(
+            env.get("MAX_MESSAGES_PER_RUN", defaults.max_messages_per_run)
+        ),
+        max_events_per_run=max_events_per_run,
+        log_level=env.get("LOG_LEVEL", defaults.log_level),
+    )
 
 
-config = Config()
+config = _load_config_from_env()
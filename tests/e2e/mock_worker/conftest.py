@@ -0,0 +1,61 @@
+"""Shared fixtures for the mock worker tests."""
+
+from dataclasses import replace
+
+import httpx
+import pytest
+
+from . import executor
+from .worker import Worker
+
+
+@pytest.fixture(scope="session", autouse=True)
+def no_node_delay():
+    """Run graphs without the simulated inter-node delay unless a test overrides it.
+
+    No test asserts on the default delay, which otherwise adds 100ms per
+    transition to every run.
+    """
+    patch = pytest.MonkeyPatch()
+    patch.setattr(executor, "config", replace(executor.config, mock_delay_ms=0))
+    executor._resolved_defaults.cache_clear()
+    yield
+    patch.undo()
+    executor._resolved_defaults.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def run_id():
+    return "test-run-123"
+
+
+@pytest.fixture(scope="session")
+def control_plane_requests() -> list[httpx.Request]:
+    """Requests received by the in-memory control plane behind ``worker``."""
+    return []
+
+
+@pytest.fixture(scope="session")
+async def worker(control_plane_requests):
+    """One Worker for the whole session, wired to an in-memory control plane.
+
+    The client goes through ``httpx.MockTransport``, so no socket is opened
+    and registration, heartbeat and poll tasks are never started. Every
+    request gets a 200 with an empty task list.
+    """
+    def handle(request: httpx.Request) -> httpx.Response:
+        control_plane_requests.append(request)
+        return httpx.Response(200, json={"tasks": []})
+
+    w = Worker(control_plane_url="http://control-plane.test")
+    await w._client.aclose()
+    w._client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    yield w
+    await w._client.aclose()
+
+
+@pytest.fixture
+def sent(control_plane_requests) -> list[httpx.Request]:
+    """Requests the shared worker sends during the current test."""
+    control_plane_requests.clear()
+    return control_plane_requests
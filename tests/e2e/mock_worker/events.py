@@ -3,11 +3,26 @@
 Events follow the LangGraph streaming event format.
 """
 
+import asyncio
+from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Any, Optional
-import json
+from typing import Any, Iterator, Optional
+import time
+
+from .config import config
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:  # orjson is an optional speedup
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
 
 
 class EventType(str, Enum):
@@ -40,83 +55,222 @@ class EventType(str, Enum):
     STATE_UPDATE = "state.update"
 
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# One bit per event type, for EventEmitter.enabled_mask
+_TYPE_BITS: dict[EventType, int] = {t: 1 << i for i, t in enumerate(EventType)}
+ALL_EVENTS = (1 << len(EventType)) - 1
+
+
+def event_mask(*types: EventType) -> int:
+    """Build an EventEmitter ``enabled_mask`` enabling only ``types``."""
+    mask = 0
+    for t in types:
+        mask |= _TYPE_BITS[t]
+    return mask
+
+
+# Longest prompt/response kept verbatim in LLM event previews
+PREVIEW_CHARS = 200
+
+
+def _preview(text: str) -> str:
+    return text if len(text) <= PREVIEW_CHARS else text[:PREVIEW_CHARS] + "..."
+
+
+# SSE framing up to the payload for each event type, encoded once at import
+_SSE_PREFIX: dict[EventType, bytes] = {
+    t: f"event: {t.value}\ndata: ".encode() for t in EventType
+}
+
+
+@dataclass(frozen=True, slots=True)
 class Event:
-    """An event emitted during execution."""
+    """An event emitted during execution.
+
+    Events are immutable once emitted, so their serialized forms are
+    computed on first use and cached.
+    """
 
     type: EventType
     run_id: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     node_id: Optional[str] = None
     data: dict = field(default_factory=dict)
+    # Wall-clock nanoseconds since the epoch; converted only when read
+    _timestamp_ns: int = field(default_factory=time.time_ns, init=False, repr=False)
+    # Serialization caches; slots leave no __dict__ for cached_property
+    _dict_cache: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _sse_cache: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def timestamp(self) -> datetime:
+        """The event timestamp as an aware UTC datetime."""
+        return _EPOCH + timedelta(microseconds=self._timestamp_ns // 1000)
+
+    @property
+    def _serialized(self) -> dict:
+        if self._dict_cache is None:
+            object.__setattr__(self, "_dict_cache", {
+                "event": self.type.value,
+                "run_id": self.run_id,
+                "timestamp": self.timestamp.isoformat(),
+                "node_id": self.node_id,
+                "data": self.data,
+            })
+        return self._dict_cache
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
-        return {
-            "event": self.type.value,
-            "run_id": self.run_id,
-            "timestamp": self.timestamp.isoformat(),
-            "node_id": self.node_id,
-            "data": self.data,
-        }
+        return dict(self._serialized)
 
     def to_sse(self) -> str:
         """Convert to Server-Sent Events format."""
-        data = json.dumps(self.to_dict())
-        return f"event: {self.type.value}\ndata: {data}\n\n"
+        return self.to_sse_bytes().decode()
 
+    def to_sse_bytes(self) -> bytes:
+        """Convert to Server-Sent Events format, encoded and ready for the wire."""
+        if self._sse_cache is None:
+            object.__setattr__(
+                self, "_sse_cache",
+                _SSE_PREFIX[self.type] + _dumps(self._serialized) + b"\n\n",
+            )
+        return self._sse_cache
 
-class EventEmitter:
-    """Collects and emits events during execution."""
 
-    def __init__(self, run_id: str):
+class EventEmitter:
+    """Collects and emits events during execution.
+
+    At most ``max_events`` events are retained (``MAX_EVENTS_PER_RUN`` by
+    default); once full, the oldest are dropped so memory stays flat on long
+    runs, and ``dropped_events`` counts how many were lost. The emit helpers
+    skip event types not set in ``enabled_mask`` (see ``event_mask``) before
+    building the event at all.
+    """
+
+    __slots__ = (
+        "run_id", "events", "enabled_mask", "listener_errors", "dropped_events",
+        "_listeners", "_sinks",
+        "_tokens_input", "_tokens_output", "_by_type",
+    )
+
+    def __init__(
+        self,
+        run_id: str,
+        max_events: Optional[int] = None,
+        enabled_mask: int = ALL_EVENTS,
+    ):
         self.run_id = run_id
-        self.events: list[Event] = []
-        self._listeners: list[callable] = []
+        self.enabled_mask = enabled_mask
+        if max_events is None:
+            max_events = config.max_events_per_run
+        if max_events < 1:
+            raise ValueError(f"max_events must be at least 1, got {max_events}")
+        self.events: deque[Event] = deque(maxlen=max_events)
+        # Events pushed out of ``events`` because it was full
+        self.dropped_events = 0
+        # Tuple snapshot, rebuilt on registration, so emit iterates cheaply
+        self._listeners: tuple[callable, ...] = ()
+        # Count of exceptions raised (and swallowed) by listeners
+        self.listener_errors = 0
+        self._sinks: tuple[asyncio.Queue, ...] = ()
+        # Running LLM token totals, kept up to date by llm_end
+        self._tokens_input = 0
+        self._tokens_output = 0
+        # Retained events indexed by type, in emit order; see events_of()
+        self._by_type: dict[EventType, deque[Event]] = {}
 
     def add_listener(self, callback: callable):
-        """Add a listener for real-time events."""
-        self._listeners.append(callback)
+        """Add a listener for real-time events.
+
+        The listener is wrapped so its exceptions are counted in
+        ``listener_errors`` instead of breaking execution.
+        """
+        def safe_listener(event: Event):
+            try:
+                callback(event)
+            except Exception:
+                self.listener_errors += 1
+
+        self._listeners += (safe_listener,)
+
+    def attach_async_sink(self, queue: asyncio.Queue):
+        """Forward every emitted event into ``queue`` without blocking.
+
+        Consumers drain the queue at their own pace. If a bounded queue is
+        full, its oldest event is dropped to make room, so a slow consumer
+        loses events rather than stalling execution.
+        """
+        self._sinks += (queue,)
 
     def emit(self, event: Event):
         """Emit an event."""
-        self.events.append(event)
+        events = self.events
+        if events and len(events) == events.maxlen:
+            # The oldest event is about to be dropped; it is also the oldest
+            # of its type, so the index stays in step with the deque
+            self._by_type[events[0].type].popleft()
+            self.dropped_events += 1
+        events.append(event)
+        by_type = self._by_type.get(event.type)
+        if by_type is None:
+            by_type = self._by_type[event.type] = deque()
+        by_type.append(event)
+        for queue in self._sinks:
+            if queue.full():
+                queue.get_nowait()  # Drop oldest
+            queue.put_nowait(event)
         for listener in self._listeners:
-            try:
-                listener(event)
-            except Exception:
-                pass  # Don't let listener errors break execution
+            listener(event)
 
     def run_started(self, input_data: dict):
         """Emit run.started event."""
+        if not self.enabled_mask & _TYPE_BITS[EventType.RUN_STARTED]:
+            return
         self.emit(Event(
             type=EventType.RUN_STARTED,
             run_id=self.run_id,
             data={"input": input_data},
         ))
 
-    def run_completed(self, output: dict, duration_ms: int):
-        """Emit run.completed event."""
+    def _emit_completed(
+        self, type: EventType, node_id: Optional[str], output: dict, duration_ms: int
+    ):
+        """Emit a run/node completion event; both share one payload shape."""
+        if not self.enabled_mask & _TYPE_BITS[type]:
+            return
         self.emit(Event(
-            type=EventType.RUN_COMPLETED,
+            type=type,
             run_id=self.run_id,
+            node_id=node_id,
             data={
                 "output": output,
                 "duration_ms": duration_ms,
             },
         ))
 
-    def run_failed(self, error: str, node_id: Optional[str] = None):
-        """Emit run.failed event."""
+    def _emit_failed(self, type: EventType, node_id: Optional[str], error: str):
+        """Emit a run/node failure event; both share one payload shape."""
+        if not self.enabled_mask & _TYPE_BITS[type]:
+            return
         self.emit(Event(
-            type=EventType.RUN_FAILED,
+            type=type,
             run_id=self.run_id,
             node_id=node_id,
             data={"error": error},
         ))
 
+    def run_completed(self, output: dict, duration_ms: int):
+        """Emit run.completed event."""
+        self._emit_completed(EventType.RUN_COMPLETED, None, output, duration_ms)
+
+    def run_failed(self, error: str, node_id: Optional[str] = None):
+        """Emit run.failed event."""
+        self._emit_failed(EventType.RUN_FAILED, node_id, error)
+
     def run_interrupted(self, node_id: str, interrupt_data: dict):
         """Emit run.interrupted event."""
+        if not self.enabled_mask & _TYPE_BITS[EventType.RUN_INTERRUPTED]:
+            return
         self.emit(Event(
             type=EventType.RUN_INTERRUPTED,
             run_id=self.run_id,
@@ -126,6 +280,8 @@ class EventEmitter:
 
     def node_started(self, node_id: str, node_type: str, input_data: dict):
         """Emit node.started event."""
+        if not self.enabled_mask & _TYPE_BITS[EventType.NODE_STARTED]:
+            return
         self.emit(Event(
             type=EventType.NODE_STARTED,
             run_id=self.run_id,
@@ -138,34 +294,23 @@ class EventEmitter:
 
     def node_completed(self, node_id: str, output: dict, duration_ms: int):
         """Emit node.completed event."""
-        self.emit(Event(
-            type=EventType.NODE_COMPLETED,
-            run_id=self.run_id,
-            node_id=node_id,
-            data={
-                "output": output,
-                "duration_ms": duration_ms,
-            },
-        ))
+        self._emit_completed(EventType.NODE_COMPLETED, node_id, output, duration_ms)
 
     def node_failed(self, node_id: str, error: str):
         """Emit node.failed event."""
-        self.emit(Event(
-            type=EventType.NODE_FAILED,
-            run_id=self.run_id,
-            node_id=node_id,
-            data={"error": error},
-        ))
+        self._emit_failed(EventType.NODE_FAILED, node_id, error)
 
     def llm_start(self, node_id: str, model: str, prompt: str):
         """Emit llm.start event."""
+        if not self.enabled_mask & _TYPE_BITS[EventType.LLM_START]:
+            return
         self.emit(Event(
             type=EventType.LLM_START,
             run_id=self.run_id,
             node_id=node_id,
             data={
                 "model": model,
-                "prompt_preview": prompt[:200] + "..." if len(prompt) > 200 else prompt,
+                "prompt_preview": _preview(prompt),
             },
         ))
 
@@ -179,13 +324,17 @@ class EventEmitter:
         duration_ms: int,
     ):
         """Emit llm.end event."""
+        self._tokens_input += tokens_input
+        self._tokens_output += tokens_output
+        if not self.enabled_mask & _TYPE_BITS[EventType.LLM_END]:
+            return
         self.emit(Event(
             type=EventType.LLM_END,
             run_id=self.run_id,
             node_id=node_id,
             data={
                 "model": model,
-                "response_preview": response[:200] + "..." if len(response) > 200 else response,
+                "response_preview": _preview(response),
                 "tokens": {
                     "input": tokens_input,
                     "output": tokens_output,
@@ -197,6 +346,8 @@ class EventEmitter:
 
     def tool_start(self, node_id: str, tool_name: str, arguments: dict):
         """Emit tool.start event."""
+        if not self.enabled_mask & _TYPE_BITS[EventType.TOOL_START]:
+            return
         self.emit(Event(
             type=EventType.TOOL_START,
             run_id=self.run_id,
@@ -209,6 +360,8 @@ class EventEmitter:
 
     def tool_end(self, node_id: str, tool_name: str, result: Any, duration_ms: int):
         """Emit tool.end event."""
+        if not self.enabled_mask & _TYPE_BITS[EventType.TOOL_END]:
+            return
         self.emit(Event(
             type=EventType.TOOL_END,
             run_id=self.run_id,
@@ -222,6 +375,8 @@ class EventEmitter:
 
     def checkpoint_created(self, checkpoint_id: str, node_id: str, state: dict):
         """Emit checkpoint.created event."""
+        if not self.enabled_mask & _TYPE_BITS[EventType.CHECKPOINT_CREATED]:
+            return
         self.emit(Event(
             type=EventType.CHECKPOINT_CREATED,
             run_id=self.run_id,
@@ -234,6 +389,8 @@ class EventEmitter:
 
     def state_update(self, node_id: str, updates: dict):
         """Emit state.update event."""
+        if not self.enabled_mask & _TYPE_BITS[EventType.STATE_UPDATE]:
+            return
         self.emit(Event(
             type=EventType.STATE_UPDATE,
             run_id=self.run_id,
@@ -245,19 +402,37 @@ class EventEmitter:
         """Get all events as dictionaries."""
         return [e.to_dict() for e in self.events]
 
+    def events_of(self, event_type: EventType | str) -> list[dict]:
+        """Get the retained events of one type as dictionaries, in emit order.
+
+        Looks the type up in an index maintained by ``emit``, so only
+        matching events are visited.
+        """
+        return [e.to_dict() for e in self._by_type.get(EventType(event_type), ())]
+
+    def iter_events_dicts(self) -> Iterator[dict]:
+        """Yield events as dictionaries one at a time, without building a list."""
+        return (e.to_dict() for e in self.events)
+
+    async def flush_sse(self, writer: asyncio.StreamWriter, batch: int = 64):
+        """Write all events to ``writer`` as SSE frames, draining once per ``batch`` events."""
+        buf = bytearray()
+        # Snapshot, since events emitted while we await drain() would
+        # otherwise mutate the deque mid-iteration
+        for i, event in enumerate(tuple(self.events), 1):
+            buf += event.to_sse_bytes()
+            if i % batch == 0:
+                writer.write(bytes(buf))
+                buf.clear()
+                await writer.drain()
+        if buf:
+            writer.write(bytes(buf))
+            await writer.drain()
+
     def get_token_summary(self) -> dict:
         """Get summary of token usage from LLM events."""
-        total_input = 0
-        total_output = 0
-
-        for event in self.events:
-            if event.type == EventType.LLM_END:
-                tokens = event.data.get("tokens", {})
-                total_input += tokens.get("input", 0)
-                total_output += tokens.get("output", 0)
-
         return {
-            "input": total_input,
-            "output": total_output,
-            "total": total_input + total_output,
+            "input": self._tokens_input,
+            "output": self._tokens_output,
+            "total": self._tokens_input + self._tokens_output,
         }
@@ -4,14 +4,28 @@ Executes graphs by traversing nodes and simulating behavior.
 """
 
 import asyncio
+import functools
 import time
-import uuid
-from dataclasses import dataclass, field
-from typing import Any, Optional
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Optional
 
 from .config import config
 from .events import EventEmitter
-from .graphs import Graph, Node, NodeType, get_graph
+from .graphs import TEMPLATE_RE, Graph, Node, NodeType, get_graph
+
+
+def _render(template: str, values: dict) -> str:
+    """Substitute ``{key}`` placeholders from ``values`` in a single pass.
+
+    Placeholders naming keys missing from ``values`` are left as-is.
+    """
+    if "{" not in template:
+        return template
+    return TEMPLATE_RE.sub(
+        lambda m: str(values[m.group(1)]) if m.group(1) in values else m.group(0),
+        template,
+    )
 
 
 class ExecutionError(Exception):
@@ -36,41 +50,123 @@ class InterruptError(Exception):
 class ExecutionState:
     """State during graph execution."""
 
+    # Run the state belongs to; scopes checkpoint IDs
+    run_id: str = ""
     values: dict = field(default_factory=dict)
-    messages: list[dict] = field(default_factory=list)
+    # Bounded so long-running graphs keep memory flat
+    messages: deque[dict] = field(
+        default_factory=lambda: deque(maxlen=config.max_messages_per_run)
+    )
     current_node: Optional[str] = None
     nodes_executed: list[str] = field(default_factory=list)
     checkpoints: list[dict] = field(default_factory=list)
+    # Also copy values and messages into each entry of ``checkpoints``. Off
+    # by default: IDs and node positions are always recorded, but copying the
+    # state after every node is the dominant allocation on long runs.
+    keep_checkpoints: bool = False
+    # Checkpoints created so far; numbers checkpoint IDs within the run
+    checkpoint_seq: int = 0
+    # Set by GraphExecutor.execute once the run reached __end__; the state
+    # is not modified afterwards
+    finished: bool = field(default=False, init=False)
+    # Cached tuple of state keys for event metadata; see keys_snapshot()
+    _keys: Optional[tuple[str, ...]] = field(default=None, init=False, repr=False, compare=False)
+    # Cached to_dict() result of a finished run
+    _dict: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
 
     def update(self, key: str, value: Any):
         """Update a state value."""
+        if key not in self.values:
+            self._keys = None
         self.values[key] = value
 
+    def keys_snapshot(self) -> tuple[str, ...]:
+        """Return the state keys as a tuple, rebuilt only after keys were added.
+
+        Writes that bypass ``update()`` are caught by the length check.
+        """
+        keys = self._keys
+        if keys is None or len(keys) != len(self.values):
+            keys = self._keys = tuple(self.values)
+        return keys
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get a state value."""
         return self.values.get(key, default)
 
     def to_dict(self) -> dict:
-        """Convert to dictionary."""
-        return {
+        """Convert to dictionary.
+
+        The result of a finished run is built once and shared by later calls,
+        so the completion event and the run report don't each copy messages.
+        """
+        if self._dict is not None:
+            return self._dict
+        result = {
             "values": self.values,
-            "messages": self.messages,
+            "messages": list(self.messages),
             "current_node": self.current_node,
             "nodes_executed": self.nodes_executed,
         }
+        if self.finished:
+            self._dict = result
+        return result
 
     def create_checkpoint(self, node_id: str) -> dict:
-        """Create a checkpoint after a node."""
+        """Create a checkpoint after a node.
+
+        Every checkpoint is recorded in ``checkpoints``; the values and
+        messages are only copied into it when ``keep_checkpoints`` is set.
+        ``nodes_executed`` is append-only, so checkpoints record its length
+        instead of a copy; read it back with ``nodes_executed_at()``.
+        """
+        # The run ID keeps IDs unique across runs and threads, so a counter
+        # within the run avoids a urandom read and UUID formatting per node
+        self.checkpoint_seq += 1
         checkpoint = {
-            "checkpoint_id": str(uuid.uuid4()),
+            "checkpoint_id": f"ckpt-{self.run_id}-{node_id}-{self.checkpoint_seq}",
             "node_id": node_id,
-            "values": self.values.copy(),
-            "messages": self.messages.copy(),
-            "nodes_executed": self.nodes_executed.copy(),
+            "nodes_executed_len": len(self.nodes_executed),
         }
+        if self.keep_checkpoints:
+            checkpoint["values"] = self.values.copy()
+            checkpoint["messages"] = self.messages.copy()
         self.checkpoints.append(checkpoint)
         return checkpoint
 
+    def nodes_executed_at(self, checkpoint: dict) -> list[str]:
+        """Return ``nodes_executed`` as it was when ``checkpoint`` was created."""
+        return self.nodes_executed[:checkpoint["nodes_executed_len"]]
+
+
+def _compile_condition(condition: Optional[str]) -> Optional[Callable[[ExecutionState], bool]]:
+    """Parse an edge condition like ``"route == 'a'"`` once into a predicate.
+
+    Returns None for unconditional edges. Conditions that don't parse
+    compile to a predicate that never matches.
+    """
+    if not condition:
+        return None
+    parts = condition.split("==")
+    if len(parts) != 2:
+        return lambda state: False
+    key = parts[0].strip()
+    expected = parts[1].strip().strip("'\"")
+    return lambda state: str(state.values.get(key)) == expected
+
+
+# Node index standing for "__end__"
+_END = -1
+# _uncond_next entry for nodes whose successor depends on state
+_ROUTE = -2
+# _uncond_next entry for nodes whose branches run concurrently; see _fanouts
+_FANOUT = -3
+
+
+async def _noop(executor: "GraphExecutor", node: Node, state: ExecutionState):
+    """Handler for nodes with no behavior of their own."""
+    return
+
 
 class GraphExecutor:
     """Executes a graph with simulated behavior."""
@@ -83,22 +179,101 @@ class GraphExecutor:
         fail_at_node: Optional[str] = None,
         interrupt_at_node: Optional[str] = None,
         token_count: int = 100,
+        keep_checkpoints: bool = False,
     ):
         self.graph = graph
         self.emitter = emitter
         self.delay_ms = delay_ms
+        # Inter-node delay in seconds, converted once for the execute loop
+        self._delay_s = delay_ms / 1000
         self.fail_at_node = fail_at_node
         self.interrupt_at_node = interrupt_at_node
         self.token_count = token_count
-
-        # Build node lookup
-        self._nodes = {n.id: n for n in graph.nodes}
-        # Build adjacency list
-        self._edges = {}
+        self.keep_checkpoints = keep_checkpoints
+
+        # Nodes are addressed by integer index; _END stands for "__end__".
+        # Targets naming no node get an index with no Node, so the error
+        # surfaces only if execution actually reaches them.
+        self._node_ids: list[str] = [n.id for n in graph.nodes]
+        self._node_list: list[Optional[Node]] = [
+            self._with_overrides(n) for n in graph.nodes
+        ]
+        self._index = {node_id: i for i, node_id in enumerate(self._node_ids)}
+        # Adjacency list of (target index, predicate), conditions parsed once
+        self._edges_out: list[list[tuple[int, Optional[Callable]]]] = [
+            [] for _ in self._node_ids
+        ]
         for edge in graph.edges:
-            if edge.source not in self._edges:
-                self._edges[edge.source] = []
-            self._edges[edge.source].append(edge)
+            self._edges_out[self._idx(edge.source)].append(
+                (self._idx(edge.target), _compile_condition(edge.condition))
+            )
+        # Router node index -> (route_key, route value -> target index, default index)
+        self._routers: dict[int, tuple[str, dict[Any, int], Optional[int]]] = {}
+        for i, node in enumerate(self._node_list[:len(graph.nodes)]):
+            if node.type == NodeType.ROUTER:
+                default = node.config.get("default")
+                self._routers[i] = (
+                    node.config.get("route_key", "route"),
+                    {k: self._idx(v) for k, v in node.config.get("routes", {}).items()},
+                    None if default is None else self._idx(default),
+                )
+        # Successor of each node that has a single unconditional edge (or no
+        # edges at all), so straight-line graphs skip _get_next_node
+        self._uncond_next: list[int] = [
+            _END if not edges
+            else edges[0][0] if len(edges) == 1 and edges[0][1] is None and i not in self._routers
+            else _ROUTE
+            for i, edges in enumerate(self._edges_out)
+        ]
+        # Fan-out node index -> (branch indices, join index). A node fans out
+        # when all of its edges are unconditional and every target leads
+        # straight to the same join, so the branches are independent. The
+        # join must be a node or __end__: nested fan-outs are not supported,
+        # and a node whose branches fan out again keeps following its first edge.
+        self._fanouts: dict[int, tuple[list[int], int]] = {}
+        for i, edges in enumerate(self._edges_out):
+            if len(edges) < 2 or i in self._routers:
+                continue
+            if any(predicate is not None for _, predicate in edges):
+                continue
+            branches = [target for target, _ in edges]
+            if _END in branches:
+                continue
+            joins = {self._uncond_next[b] for b in branches}
+            if len(joins) != 1:
+                continue
+            join = joins.pop()
+            if join >= 0 or join == _END:
+                self._fanouts[i] = (branches, join)
+                self._uncond_next[i] = _FANOUT
+        # Handler per node index, resolved once from _HANDLERS after overrides
+        self._handlers: list[Optional[Callable]] = [
+            _HANDLERS.get(n.type) if n is not None else None for n in self._node_list
+        ]
+
+    def _with_overrides(self, node: Node) -> Node:
+        """Apply this run's forced failure/interrupt to ``node``.
+
+        Graphs are shared by every run, so overridden nodes are copies
+        private to this executor rather than edits to the registry.
+        """
+        if node.id == self.fail_at_node:
+            node = replace(node, config={**node.config, "should_fail": True})
+        if node.id == self.interrupt_at_node:
+            node = replace(node, type=NodeType.HUMAN, config={**node.config, "interrupt": True})
+        return node
+
+    def _idx(self, node_id: str) -> int:
+        """Return the index for ``node_id``, allocating one for unknown targets."""
+        if node_id == "__end__":
+            return _END
+        idx = self._index.get(node_id)
+        if idx is None:
+            idx = self._index[node_id] = len(self._node_ids)
+            self._node_ids.append(node_id)
+            self._node_list.append(None)
+            self._edges_out.append([])
+        return idx
 
     async def execute(
         self,
@@ -117,41 +292,44 @@ class GraphExecutor:
             Final execution state
         """
         # Initialize state
-        state = ExecutionState()
+        state = ExecutionState(
+            run_id=self.emitter.run_id, keep_checkpoints=self.keep_checkpoints
+        )
         if initial_state:
             state.values = initial_state.get("values", {})
-            state.messages = initial_state.get("messages", [])
+            state.messages = deque(
+                initial_state.get("messages", ()), maxlen=config.max_messages_per_run
+            )
             state.nodes_executed = initial_state.get("nodes_executed", [])
+            # Continue numbering so resumed runs don't reuse checkpoint IDs
+            state.checkpoint_seq = len(state.nodes_executed)
 
         # Merge input into state
         state.values.update(input_data)
 
         # Determine starting node
-        if resume_from:
-            current_node_id = resume_from
-        else:
-            current_node_id = self.graph.entry_point
+        current_idx = self._idx(resume_from or self.graph.entry_point)
+
+        # Per-run constants and call targets, bound once outside the loop
+        node_ids = self._node_ids
+        node_list = self._node_list
+        handlers = self._handlers
+        execute_node = self._execute_node
+        post_node = self._post_node
+        delay_s = self._delay_s
 
         # Execute nodes until we reach __end__
-        while current_node_id and current_node_id != "__end__":
-            node = self._nodes.get(current_node_id)
-            if not node:
+        while current_idx != _END:
+            current_node_id = node_ids[current_idx]
+            node = node_list[current_idx]
+            if node is None:
                 raise ExecutionError(f"Node not found: {current_node_id}")
 
             state.current_node = current_node_id
 
-            # Check for forced failure
-            if self.fail_at_node == current_node_id:
-                node.config["should_fail"] = True
-
-            # Check for forced interrupt
-            if self.interrupt_at_node == current_node_id:
-                node.type = NodeType.HUMAN
-                node.config["interrupt"] = True
-
             # Execute the node
             try:
-                await self._execute_node(node, state)
+                await execute_node(node, handlers[current_idx], state)
             except InterruptError:
                 raise  # Re-raise interrupts
             except ExecutionError:
@@ -159,64 +337,100 @@ class GraphExecutor:
             except Exception as e:
                 raise ExecutionError(str(e), current_node_id)
 
-            state.nodes_executed.append(current_node_id)
-
-            # Create checkpoint after node
-            checkpoint = state.create_checkpoint(current_node_id)
-            self.emitter.checkpoint_created(
-                checkpoint["checkpoint_id"],
-                current_node_id,
-                state.values,
-            )
-
-            # Determine next node
-            current_node_id = self._get_next_node(current_node_id, state)
+            next_idx = post_node(current_idx, current_node_id, state)
+            if next_idx == _FANOUT:
+                if delay_s > 0:
+                    await asyncio.sleep(delay_s)
+                next_idx = await self._execute_fanout(current_idx, state)
+            current_idx = next_idx
 
             # Delay between nodes (simulates processing time)
-            if self.delay_ms > 0 and current_node_id and current_node_id != "__end__":
-                await asyncio.sleep(self.delay_ms / 1000)
+            if delay_s > 0 and current_idx != _END:
+                await asyncio.sleep(delay_s)
 
         state.current_node = None
+        state.finished = True
         return state
 
-    async def _execute_node(self, node: Node, state: ExecutionState):
-        """Execute a single node."""
-        start_time = time.time()
+    def _post_node(self, idx: int, node_id: str, state: ExecutionState) -> int:
+        """Record a finished node, checkpoint it, and return the next node index.
 
-        # Emit node started
-        self.emitter.node_started(
-            node.id,
-            node.type.value,
-            {"state_keys": list(state.values.keys())},
+        Kept synchronous so the execute coroutine only suspends on real awaits.
+        """
+        state.nodes_executed.append(node_id)
+
+        # Create checkpoint after node
+        checkpoint = state.create_checkpoint(node_id)
+        self.emitter.checkpoint_created(
+            checkpoint["checkpoint_id"],
+            node_id,
+            state.values,
         )
 
-        try:
-            if node.type == NodeType.START:
-                pass  # No-op
+        # Determine next node
+        next_idx = self._uncond_next[idx]
+        if next_idx == _ROUTE:
+            next_idx = self._get_next_node(idx, state)
+        return next_idx
 
-            elif node.type == NodeType.END:
-                pass  # No-op
+    async def _execute_fanout(self, idx: int, state: ExecutionState) -> int:
+        """Run the branches of fan-out node ``idx`` concurrently; return the join index.
 
-            elif node.type == NodeType.LLM:
-                await self._execute_llm_node(node, state)
+        Branches share ``state``, and ``state.current_node`` stays on the
+        fan-out node while they run. Every branch runs to completion, then the
+        successful ones are checkpointed in edge order and the first error,
+        if any, is raised.
+        """
+        branches, join = self._fanouts[idx]
+        results = await asyncio.gather(
+            *(self._execute_branch(branch, state) for branch in branches),
+            return_exceptions=True,
+        )
+        error = None
+        for branch, result in zip(branches, results):
+            if isinstance(result, BaseException):
+                error = error or result
+            else:
+                self._post_node(branch, self._node_ids[branch], state)
+        if error is not None:
+            raise error
+        return join
+
+    async def _execute_branch(self, idx: int, state: ExecutionState):
+        """Execute one fan-out branch, wrapping errors like the execute loop."""
+        node_id = self._node_ids[idx]
+        node = self._node_list[idx]
+        if node is None:
+            raise ExecutionError(f"Node not found: {node_id}")
 
-            elif node.type == NodeType.TOOL:
-                await self._execute_tool_node(node, state)
+        try:
+            await self._execute_node(node, self._handlers[idx], state)
+        except (InterruptError, ExecutionError):
+            raise
+        except Exception as e:
+            raise ExecutionError(str(e), node_id)
 
-            elif node.type == NodeType.ROUTER:
-                pass  # Routing is handled in _get_next_node
+    async def _execute_node(self, node: Node, handler: Optional[Callable], state: ExecutionState):
+        """Execute a single node."""
+        start_time = time.time()
 
-            elif node.type == NodeType.HUMAN:
-                await self._execute_human_node(node, state)
+        # Emit node started
+        self.emitter.node_started(
+            node.id,
+            node.type,  # A str enum, so it serializes as its value
+            {"state_keys": state.keys_snapshot()},
+        )
 
-            else:
+        try:
+            if handler is None:
                 raise ExecutionError(f"Unknown node type: {node.type}", node.id)
+            await handler(self, node, state)
 
             # Emit node completed
             duration_ms = int((time.time() - start_time) * 1000)
             self.emitter.node_completed(
                 node.id,
-                {"state_keys": list(state.values.keys())},
+                {"state_keys": state.keys_snapshot()},
                 duration_ms,
             )
 
@@ -236,16 +450,14 @@ class GraphExecutor:
             raise ExecutionError(error_msg, node.id)
 
         # Simulate LLM call
-        model = config.get("model", "gpt-4-mock")
+        model = node.model
         template = config.get("response_template", "Mock response")
 
-        # Format template with state values
-        response = template
-        for key, value in state.values.items():
-            response = response.replace(f"{{{key}}}", str(value))
+        # Format template with state values; static templates need no pass
+        response = _render(template, state.values) if node.template_keys else template
 
         # Get token counts
-        tokens = config.get("simulated_tokens", {})
+        tokens = node.simulated_tokens
         tokens_input = tokens.get("input", self.token_count)
         tokens_output = tokens.get("output", self.token_count // 2)
 
@@ -295,21 +507,8 @@ class GraphExecutor:
         tools = config.get("tools", {})
         pending_calls = state.get("pending_tool_calls", [])
 
-        tool_results = []
-
-        for call in pending_calls:
+        async def run_tool(call: dict) -> dict:
             tool_name = call.get("name")
-            arguments = call.get("arguments", {})
-
-            # Format arguments
-            formatted_args = {}
-            for key, value in arguments.items():
-                if isinstance(value, str):
-                    for state_key, state_value in state.values.items():
-                        value = value.replace(f"{{{state_key}}}", str(state_value))
-                formatted_args[key] = value
-
-            self.emitter.tool_start(node.id, tool_name, formatted_args)
 
             # Get tool response
             tool_config = tools.get(tool_name, {})
@@ -319,11 +518,24 @@ class GraphExecutor:
             await asyncio.sleep(0.02)  # 20ms for tool call
 
             self.emitter.tool_end(node.id, tool_name, result, 20)
-
-            tool_results.append({
+            return {
                 "tool": tool_name,
                 "result": result,
-            })
+            }
+
+        for call in pending_calls:
+            # Format arguments
+            formatted_args = {}
+            for key, value in call.get("arguments", {}).items():
+                if isinstance(value, str):
+                    value = _render(value, state.values)
+                formatted_args[key] = value
+
+            self.emitter.tool_start(node.id, call.get("name"), formatted_args)
+
+        # Mock tools are independent, so their simulated latency overlaps;
+        # gather keeps results in call order
+        tool_results = list(await asyncio.gather(*map(run_tool, pending_calls)))
 
         # Store results in state
         state.update("tool_results", tool_results)
@@ -346,49 +558,56 @@ class GraphExecutor:
                 required_fields=config.get("required_fields", []),
             )
 
-    def _get_next_node(self, current_node_id: str, state: ExecutionState) -> Optional[str]:
-        """Determine the next node based on edges and conditions."""
-        edges = self._edges.get(current_node_id, [])
+    def _get_next_node(self, current_idx: int, state: ExecutionState) -> int:
+        """Determine the next node index based on edges and conditions."""
+        edges = self._edges_out[current_idx]
 
         if not edges:
-            return "__end__"
+            return _END
 
-        # For router nodes, evaluate conditions
-        current_node = self._nodes.get(current_node_id)
-        if current_node and current_node.type == NodeType.ROUTER:
-            config = current_node.config
-            route_key = config.get("route_key", "route")
+        # For router nodes, look the route up in state
+        router = self._routers.get(current_idx)
+        if router:
+            route_key, routes, default = router
             route_value = state.get(route_key)
-            routes = config.get("routes", {})
-
             if route_value in routes:
                 return routes[route_value]
-            return config.get("default", edges[0].target)
-
-        # For conditional edges, evaluate
-        for edge in edges:
-            if edge.condition:
-                # Simple condition evaluation
-                # Format: "key == 'value'" or "key == value"
-                if self._evaluate_condition(edge.condition, state):
-                    return edge.target
-            else:
-                # Default edge (no condition)
-                return edge.target
+            return default if default is not None else edges[0][0]
+
+        # First edge whose condition holds, or the first unconditional edge
+        for target, predicate in edges:
+            if predicate is None or predicate(state):
+                return target
+
+        return edges[0][0]
+
 
-        return edges[0].target if edges else "__end__"
+# Node type -> handler, called as handler(executor, node, state). Plain
+# functions rather than per-executor bound methods. Routing is handled in
+# _get_next_node, so routers are no-ops here.
+_HANDLERS = {
+    NodeType.START: _noop,
+    NodeType.END: _noop,
+    NodeType.LLM: GraphExecutor._execute_llm_node,
+    NodeType.TOOL: GraphExecutor._execute_tool_node,
+    NodeType.ROUTER: _noop,
+    NodeType.HUMAN: GraphExecutor._execute_human_node,
+}
 
-    def _evaluate_condition(self, condition: str, state: ExecutionState) -> bool:
-        """Evaluate a simple condition against state."""
-        # Parse simple conditions like "route == 'a'"
-        if "==" in condition:
-            parts = condition.split("==")
-            if len(parts) == 2:
-                key = parts[0].strip()
-                expected = parts[1].strip().strip("'\"")
-                actual = state.get(key)
-                return str(actual) == expected
-        return False
+
+@functools.lru_cache(maxsize=16)
+def _resolved_defaults(graph_id: str) -> tuple[Graph, int, Optional[str], Optional[str], int]:
+    """Resolve the graph and worker-level settings for runs without ``_mock_config``.
+
+    Both the registry and the config are immutable, so this is cached per graph.
+    """
+    return (
+        get_graph(graph_id),
+        config.mock_delay_ms,
+        config.mock_fail_at_node,
+        config.mock_interrupt_at_node,
+        config.mock_token_count,
+    )
 
 
 async def execute_run(
@@ -413,15 +632,17 @@ async def execute_run(
     # Check for per-run config override
     mock_config = input_data.pop("_mock_config", None)
 
-    graph = get_graph(mock_config.get("graph", graph_id) if mock_config else graph_id)
+    if mock_config:
+        graph = get_graph(mock_config.get("graph", graph_id))
+        # Apply config overrides
+        delay_ms = mock_config.get("delay_ms", config.mock_delay_ms)
+        fail_at = mock_config.get("fail_at", config.mock_fail_at_node)
+        interrupt_at = mock_config.get("interrupt_at", config.mock_interrupt_at_node)
+        token_count = mock_config.get("simulate_tokens", config.mock_token_count)
+    else:
+        graph, delay_ms, fail_at, interrupt_at, token_count = _resolved_defaults(graph_id)
     emitter = EventEmitter(run_id)
 
-    # Apply config overrides
-    delay_ms = mock_config.get("delay_ms", config.mock_delay_ms) if mock_config else config.mock_delay_ms
-    fail_at = mock_config.get("fail_at", config.mock_fail_at_node) if mock_config else config.mock_fail_at_node
-    interrupt_at = mock_config.get("interrupt_at", config.mock_interrupt_at_node) if mock_config else config.mock_interrupt_at_node
-    token_count = mock_config.get("simulate_tokens", config.mock_token_count) if mock_config else config.mock_token_count
-
     executor = GraphExecutor(
         graph=graph,
         emitter=emitter,
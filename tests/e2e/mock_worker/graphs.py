@@ -3,10 +3,14 @@
 Each graph is a realistic simulation of agent behavior without actual LLM calls.
 """
 
+import re
 from dataclasses import dataclass, field
 from typing import Any, Callable, Optional
 from enum import Enum
 
+# "{key}" placeholders in response templates and tool arguments
+TEMPLATE_RE = re.compile(r"\{([a-zA-Z_]\w*)\}")
+
 
 class NodeType(str, Enum):
     START = "start"
@@ -17,16 +21,31 @@ class NodeType(str, Enum):
     HUMAN = "human"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Node:
     """A node in the graph."""
 
     id: str
     type: NodeType
     config: dict = field(default_factory=dict)
+    # State keys referenced by the response template, derived from config.
+    # Empty for static templates, which the executor uses without rendering.
+    template_keys: frozenset[str] = field(init=False, repr=False, compare=False)
+    # LLM settings resolved from config once, with their defaults applied
+    model: str = field(init=False, repr=False, compare=False)
+    simulated_tokens: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        config = self.config
+        template = config.get("response_template", "")
+        object.__setattr__(
+            self, "template_keys", frozenset(TEMPLATE_RE.findall(template))
+        )
+        object.__setattr__(self, "model", config.get("model", "gpt-4-mock"))
+        object.__setattr__(self, "simulated_tokens", config.get("simulated_tokens", {}))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Edge:
     """An edge connecting nodes."""
 
@@ -35,7 +54,7 @@ class Edge:
     condition: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Graph:
     """A complete graph definition."""
 
@@ -356,6 +375,73 @@ FAILURE = Graph(
     entry_point="start_ok",
 )
 
+PARALLEL_FANOUT = Graph(
+    id="parallel_fanout",
+    name="Parallel Fan-out",
+    description="Independent branches run concurrently, then join",
+    nodes=[
+        Node(id="__start__", type=NodeType.START),
+        Node(
+            id="split",
+            type=NodeType.LLM,
+            config={
+                "response_template": "Splitting work for: {message}",
+                "simulated_tokens": {"input": 20, "output": 10},
+            },
+        ),
+        Node(
+            id="branch_a",
+            type=NodeType.LLM,
+            config={
+                "response_template": "Branch A result",
+                "output_key": "result_a",
+                "output_value": "a",
+                "simulated_tokens": {"input": 30, "output": 20},
+            },
+        ),
+        Node(
+            id="branch_b",
+            type=NodeType.LLM,
+            config={
+                "response_template": "Branch B result",
+                "output_key": "result_b",
+                "output_value": "b",
+                "simulated_tokens": {"input": 30, "output": 20},
+            },
+        ),
+        Node(
+            id="branch_c",
+            type=NodeType.LLM,
+            config={
+                "response_template": "Branch C result",
+                "output_key": "result_c",
+                "output_value": "c",
+                "simulated_tokens": {"input": 30, "output": 20},
+            },
+        ),
+        Node(
+            id="join",
+            type=NodeType.LLM,
+            config={
+                "response_template": "Joined results: {result_a}, {result_b}, {result_c}",
+                "simulated_tokens": {"input": 90, "output": 40},
+            },
+        ),
+        Node(id="__end__", type=NodeType.END),
+    ],
+    edges=[
+        Edge(source="__start__", target="split"),
+        Edge(source="split", target="branch_a"),
+        Edge(source="split", target="branch_b"),
+        Edge(source="split", target="branch_c"),
+        Edge(source="branch_a", target="join"),
+        Edge(source="branch_b", target="join"),
+        Edge(source="branch_c", target="join"),
+        Edge(source="join", target="__end__"),
+    ],
+    entry_point="split",
+)
+
 
 # =============================================================================
 # GRAPH REGISTRY
@@ -369,14 +455,16 @@ GRAPHS: dict[str, Graph] = {
     "human_interrupt": HUMAN_INTERRUPT,
     "long_running": LONG_RUNNING,
     "failure": FAILURE,
+    "parallel_fanout": PARALLEL_FANOUT,
 }
 
 
 def get_graph(graph_id: str) -> Graph:
     """Get a graph by ID."""
-    if graph_id not in GRAPHS:
+    graph = GRAPHS.get(graph_id)
+    if graph is None:
         raise ValueError(f"Unknown graph: {graph_id}. Available: {list(GRAPHS.keys())}")
-    return GRAPHS[graph_id]
+    return graph
 
 
 def list_graphs() -> list[str]:
@@ -0,0 +1,209 @@
+"""Tests for the mock worker's event emitter.
+
+Run with: pytest tests/e2e/mock_worker/test_events.py -v
+"""
+
+import asyncio
+from datetime import datetime, timezone
+import json
+
+import pytest
+
+from . import events as events_module
+from .config import Config, _load_config_from_env
+from .events import EventEmitter, EventType, event_mask
+from .executor import GraphExecutor
+from .graphs import get_graph
+
+
+class TestEventBuffer:
+    """Tests for the bounded per-run event buffer."""
+
+    def test_overflow_drops_oldest_and_counts(self, run_id):
+        """A full buffer drops its oldest events and records how many."""
+        emitter = EventEmitter(run_id, max_events=2)
+
+        for node_id in ("a", "b", "c"):
+            emitter.node_started(node_id, "llm", {})
+
+        assert [e.node_id for e in emitter.events] == ["b", "c"]
+        assert [e["node_id"] for e in emitter.events_of(EventType.NODE_STARTED)] == ["b", "c"]
+        assert emitter.dropped_events == 1
+
+    def test_default_bound_comes_from_config(self, run_id, monkeypatch):
+        """Without an explicit bound the emitter uses MAX_EVENTS_PER_RUN."""
+        monkeypatch.setattr(events_module, "config", Config(max_events_per_run=3))
+        emitter = EventEmitter(run_id)
+
+        assert emitter.events.maxlen == 3
+        assert emitter.dropped_events == 0
+
+
+    def test_rejects_bound_below_one(self, run_id):
+        """A zero bound is refused up front rather than failing on first emit."""
+        with pytest.raises(ValueError):
+            EventEmitter(run_id, max_events=0)
+
+    def test_config_rejects_bound_below_one(self, monkeypatch):
+        """MAX_EVENTS_PER_RUN=0 is a configuration error."""
+        monkeypatch.setenv("MAX_EVENTS_PER_RUN", "0")
+        with pytest.raises(ValueError):
+            _load_config_from_env()
+
+
+class TestAsyncSink:
+    """Tests for forwarding events into asyncio queues."""
+
+    def test_full_sink_drops_oldest(self, run_id):
+        """A full bounded queue loses its oldest event instead of blocking emit."""
+        emitter = EventEmitter(run_id)
+        queue = asyncio.Queue(maxsize=2)
+        emitter.attach_async_sink(queue)
+
+        for node_id in ("a", "b", "c"):
+            emitter.node_started(node_id, "llm", {})
+
+        assert queue.qsize() == 2
+        assert [queue.get_nowait().node_id for _ in range(2)] == ["b", "c"]
+        # The emitter itself keeps every event
+        assert [e.node_id for e in emitter.events] == ["a", "b", "c"]
+
+    def test_unbounded_sink_receives_everything(self, run_id):
+        """Every attached queue gets every event, in emit order."""
+        emitter = EventEmitter(run_id)
+        first, second = asyncio.Queue(), asyncio.Queue()
+        emitter.attach_async_sink(first)
+        emitter.attach_async_sink(second)
+
+        emitter.run_started({})
+        emitter.node_started("a", "llm", {})
+
+        for queue in (first, second):
+            assert [queue.get_nowait().type.value for _ in range(2)] == [
+                "run.started",
+                "node.started",
+            ]
+
+
+class _FakeWriter:
+    """Records what an asyncio.StreamWriter would be asked to send."""
+
+    def __init__(self):
+        self.writes: list[bytes] = []
+        self.drains = 0
+
+    def write(self, data: bytes):
+        self.writes.append(data)
+
+    async def drain(self):
+        self.drains += 1
+
+
+class TestSerialization:
+    """Tests for bulk event serialization."""
+
+    def test_to_sse_frames_event(self, run_id):
+        """to_sse returns the SSE frame as text; to_sse_bytes as encoded bytes."""
+        emitter = EventEmitter(run_id)
+        emitter.node_started("a", "llm", {})
+        event = emitter.events[0]
+
+        frame = event.to_sse()
+        assert isinstance(frame, str)
+        assert frame.startswith("event: node.started\ndata: {")
+        assert frame.endswith("}\n\n")
+        assert json.loads(frame.split("data: ", 1)[1]) == event.to_dict()
+        assert event.to_sse_bytes() == frame.encode()
+
+    def test_timestamp_is_aware_datetime(self, run_id):
+        """Event.timestamp stays a UTC datetime and serializes as ISO 8601."""
+        emitter = EventEmitter(run_id)
+        emitter.run_started({})
+        event = emitter.events[0]
+
+        assert isinstance(event.timestamp, datetime)
+        assert event.timestamp.tzinfo is timezone.utc
+        assert event.to_dict()["timestamp"] == event.timestamp.isoformat()
+
+    def test_iter_events_dicts_matches_get_all_events(self, run_id):
+        """The lazy iterator yields the same dictionaries as get_all_events."""
+        emitter = EventEmitter(run_id)
+        emitter.run_started({"message": "hi"})
+        emitter.node_started("a", "llm", {})
+
+        assert list(emitter.iter_events_dicts()) == emitter.get_all_events()
+
+    async def test_flush_sse_writes_in_batches(self, run_id):
+        """SSE frames are written and drained once per batch of 64 events."""
+        emitter = EventEmitter(run_id)
+        for i in range(130):
+            emitter.node_started(f"n{i}", "llm", {})
+        writer = _FakeWriter()
+
+        await emitter.flush_sse(writer)
+
+        frames = [e.to_sse_bytes() for e in emitter.events]
+        assert writer.writes == [
+            b"".join(frames[:64]),
+            b"".join(frames[64:128]),
+            b"".join(frames[128:]),
+        ]
+        assert writer.drains == 3
+        assert writer.writes[0].startswith(b"event: node.started\ndata: {")
+
+
+class TestEnabledMask:
+    """Tests for restricting which event types are emitted."""
+
+    def test_disabled_types_are_skipped(self, run_id):
+        """Only the types in enabled_mask are recorded."""
+        emitter = EventEmitter(
+            run_id, enabled_mask=event_mask(EventType.RUN_STARTED, EventType.NODE_FAILED)
+        )
+        emitter.run_started({})
+        emitter.node_started("a", "llm", {})
+        emitter.node_failed("a", "boom")
+        emitter.checkpoint_created("ckpt-1", "a", {})
+
+        assert [e.type for e in emitter.events] == [EventType.RUN_STARTED, EventType.NODE_FAILED]
+
+    def test_tokens_counted_with_llm_end_disabled(self, run_id):
+        """Token totals still accumulate when llm.end events are not emitted."""
+        emitter = EventEmitter(run_id, enabled_mask=event_mask(EventType.RUN_STARTED))
+        emitter.llm_end("a", "gpt-4-mock", "hi", 10, 5, 50)
+
+        assert not emitter.events
+        assert emitter.get_token_summary() == {"input": 10, "output": 5, "total": 15}
+
+
+class TestListeners:
+    """Tests for real-time event listeners."""
+
+    def test_raising_listener_is_counted_not_propagated(self, run_id):
+        """A failing listener doesn't stop emit or the listeners after it."""
+        emitter = EventEmitter(run_id)
+        received = []
+
+        def broken(event):
+            raise RuntimeError("listener bug")
+
+        emitter.add_listener(broken)
+        emitter.add_listener(received.append)
+
+        emitter.node_started("a", "llm", {})
+        emitter.node_started("b", "llm", {})
+
+        assert emitter.listener_errors == 2
+        assert [e.node_id for e in received] == ["a", "b"]
+        assert len(emitter.events) == 2
+
+    async def test_raising_listener_does_not_fail_run(self, run_id):
+        """A run still completes when a listener raises on every event."""
+        emitter = EventEmitter(run_id)
+        emitter.add_listener(lambda event: 1 / 0)
+        executor = GraphExecutor(get_graph("simple_echo"), emitter, delay_ms=0)
+
+        state = await executor.execute({"message": "hello"})
+
+        assert state.finished
+        assert emitter.listener_errors == len(emitter.events) > 0
@@ -0,0 +1,232 @@
+"""Tests for the mock worker's control plane protocol.
+
+Run with: pytest tests/e2e/mock_worker/test_worker.py -v
+"""
+
+import asyncio
+import functools
+import json
+
+import httpx
+
+from . import worker as worker_module
+from .config import config
+from .events import EventEmitter
+from .executor import ExecutionState
+from .graphs import list_graphs
+from .worker import EVENT_BATCH_SIZE, Worker, _cancel_tasks
+
+
+async def _worker_with(handle, **kwargs) -> Worker:
+    """A Worker of its own whose requests go to ``handle`` instead of a socket."""
+    w = Worker(control_plane_url="http://control-plane.test", **kwargs)
+    await w._client.aclose()
+    w._client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    return w
+
+
+def _event_types(requests: list[httpx.Request]) -> list[tuple[str, str]]:
+    """(run_id, event_type) of each worker events POST, in send order."""
+    bodies = (json.loads(r.content) for r in requests if r.url.path.endswith("/events"))
+    return [(b["run_id"], b["event_type"]) for b in bodies]
+
+
+class TestLifecycle:
+    """Tests for starting and stopping a worker."""
+
+    async def test_stop_cancels_tasks_and_deregisters(self):
+        """Stopping retires every background task and deregisters."""
+        paths = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            paths.append(request.url.path)
+            return httpx.Response(200, json={"tasks": []})
+
+        # A worker of its own, since stop() closes the client
+        w = await _worker_with(handle)
+
+        await w.start()
+        tasks = [w._heartbeat_task, w._poll_task, w._outbox_task, *w._run_consumers]
+        await w.stop()
+
+        assert all(t.done() for t in tasks)
+        assert paths[0] == "/api/v1/workers/register"
+        assert paths[-1] == f"/api/v1/workers/{w.state.worker_id}/deregister"
+
+    async def test_stop_flushes_outbox_before_deregistering(self):
+        """Run reports still queued at stop() are sent before deregistration."""
+        requests = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json={"tasks": []})
+
+        w = await _worker_with(handle)
+        await w.start()
+        w._enqueue("run-1", "run_in_progress", functools.partial(
+            w._update_run_status, "thread-1", "run-1", "in_progress",
+        ))
+        await w.stop()
+
+        assert _event_types(requests) == [("run-1", "run_in_progress")]
+        assert requests[-1].url.path.endswith("/deregister")
+
+
+class TestRegistration:
+    """Tests for worker registration."""
+
+    async def test_registers_all_graphs(self, worker, sent):
+        """Registration advertises every graph with its definition."""
+        await worker._register()
+
+        assert worker.state.registered
+        assert [r.url.path for r in sent] == ["/api/v1/workers/register"]
+        body = json.loads(sent[0].content)
+        assert body["capabilities"]["graphs"] == list_graphs()
+        assert [g["graph_id"] for g in body["graph_definitions"]] == list_graphs()
+
+    async def test_uses_worker_id_assigned_at_registration(self):
+        """Later requests address the worker ID the control plane returned."""
+        paths = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            paths.append(request.url.path)
+            return httpx.Response(200, json={"worker_id": "assigned-1"})
+
+        w = await _worker_with(handle, worker_id="requested-1")
+        try:
+            await w._register()
+            await w._send_heartbeat()
+        finally:
+            await w._client.aclose()
+
+        assert w.state.worker_id == "assigned-1"
+        assert paths[-1] == "/api/v1/workers/assigned-1/heartbeat"
+
+
+class TestPolling:
+    """Tests for polling the control plane for runs."""
+
+    async def test_poll_requests_free_slots(self, worker, sent):
+        """An idle worker asks for as many runs as it has slots."""
+        accepted = await worker._poll_for_runs()
+
+        assert accepted == 0
+        assert json.loads(sent[0].content) == {"max_tasks": worker._free_slots()}
+
+    async def test_poll_counts_queued_and_active_runs(self, worker, sent):
+        """Runs waiting in the inbox take slots just like running ones."""
+        worker.state.active_runs["run-active"] = {}
+        for i in range(2):
+            worker._runs_inbox.put_nowait({"run_id": f"run-queued-{i}"})
+        try:
+            await worker._poll_for_runs()
+        finally:
+            del worker.state.active_runs["run-active"]
+            while not worker._runs_inbox.empty():
+                worker._runs_inbox.get_nowait()
+                worker._runs_inbox.task_done()
+
+        assert json.loads(sent[0].content) == {"max_tasks": config.max_concurrent_runs - 3}
+
+
+class TestRunConsumers:
+    """Tests for the fixed pool of run consumers."""
+
+    async def test_concurrent_runs_capped(self, monkeypatch):
+        """No more than max_concurrent_runs execute at once; the rest wait queued."""
+        running = peak = 0
+        release = asyncio.Event()
+
+        async def fake_execute_run(run_id, graph_id, input_data):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+            return ExecutionState(), EventEmitter(run_id)
+
+        monkeypatch.setattr(worker_module, "execute_run", fake_execute_run)
+        w = await _worker_with(lambda request: httpx.Response(200, json={}))
+        w._run_consumers = [
+            asyncio.create_task(w._run_consumer()) for _ in range(config.max_concurrent_runs)
+        ]
+        try:
+            for i in range(config.max_concurrent_runs + 3):
+                w._runs_inbox.put_nowait({"run_id": f"run-{i}", "thread_id": "thread-1"})
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+            assert peak == running == config.max_concurrent_runs
+            assert w._runs_inbox.qsize() == 3
+            assert w._free_slots() <= 0  # The poll loop stops asking for runs
+
+            release.set()
+            await w._runs_inbox.join()
+            assert peak == config.max_concurrent_runs
+            assert w.state.total_runs == config.max_concurrent_runs + 3
+        finally:
+            await _cancel_tasks(*w._run_consumers)
+            await w._client.aclose()
+
+
+class TestEvents:
+    """Tests for sending run events."""
+
+    async def test_events_sent_in_batches(self, worker, sent):
+        """Events are split into batches of EVENT_BATCH_SIZE."""
+        events = [{"event": "node.started", "seq": i} for i in range(2 * EVENT_BATCH_SIZE + 1)]
+        await worker._send_events("thread-1", "run-1", events)
+
+        assert {r.url.path for r in sent} == {"/api/v1/threads/thread-1/runs/run-1/events"}
+        batches = [json.loads(r.content)["events"] for r in sent]
+        assert sorted(map(len, batches)) == [1, EVENT_BATCH_SIZE, EVENT_BATCH_SIZE]
+        assert sorted(e["seq"] for batch in batches for e in batch) == list(range(len(events)))
+
+
+class TestOutbox:
+    """Tests for the background run report sender."""
+
+    async def _drain(self, worker):
+        """Run the outbox loop until everything queued so far is sent."""
+        task = asyncio.create_task(worker._outbox_loop())
+        try:
+            await worker._outbox.join()
+        finally:
+            await _cancel_tasks(task)
+
+    async def test_keeps_latest_report_per_run_and_kind(self, worker, sent):
+        """Queued reports of the same kind for a run collapse to the last one."""
+        for step in range(3):
+            worker._enqueue("run-1", "run_in_progress", functools.partial(
+                worker._update_run_status, "thread-1", "run-1", "in_progress",
+                metadata={"step": step},
+            ))
+
+        await self._drain(worker)
+
+        assert len(sent) == 1
+        assert json.loads(sent[0].content)["data"]["metadata"] == {"step": 2}
+
+    async def test_reports_of_one_run_keep_their_order(self, worker, sent):
+        """A run's completion is never sent before its in-progress update."""
+        for run_id in ("run-1", "run-2"):
+            worker._enqueue(run_id, "run_in_progress", functools.partial(
+                worker._update_run_status, "thread-1", run_id, "in_progress",
+            ))
+        for run_id in ("run-1", "run-2"):
+            worker._enqueue(run_id, "run_completed", functools.partial(
+                worker._complete_run, "thread-1", run_id, status="success",
+            ))
+
+        await self._drain(worker)
+
+        reports = _event_types(sent)
+        assert sorted(reports) == [
+            ("run-1", "run_completed"),
+            ("run-1", "run_in_progress"),
+            ("run-2", "run_completed"),
+            ("run-2", "run_in_progress"),
+        ]
+        for run_id in ("run-1", "run-2"):
+            assert [t for r, t in reports if r == run_id] == ["run_in_progress", "run_completed"]
@@ -4,7 +4,7 @@ Handles registration, heartbeat, run assignment, and event streaming.
 """
 
 import asyncio
-import json
+import functools
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -18,8 +18,69 @@ from .events import Event, EventEmitter
 from .executor import ExecutionError, InterruptError, execute_run
 from .graphs import GRAPHS, get_graph
 
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:  # orjson is an optional speedup
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 log = structlog.get_logger()
 
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# Events per POST to the run events endpoint, and concurrent POSTs per worker
+EVENT_BATCH_SIZE = 50
+MAX_INFLIGHT_EVENT_POSTS = 10
+# Most queued run reports the background sender takes per round
+OUTBOX_BATCH_SIZE = 64
+# Idle connections to the control plane are kept open this long
+HTTP_KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+# Registration data derived from the static GRAPHS table, built once at import
+# and reused by every (re-)registration
+_GRAPH_IDS = list(GRAPHS)
+_GRAPH_DEFINITIONS = [
+    {
+        "graph_id": graph_id,
+        "name": graph.name,
+        "description": graph.description,
+        "nodes": [
+            {
+                "id": n.id,
+                "type": n.type.value,
+                "config": n.config,
+            }
+            for n in graph.nodes
+        ],
+        "edges": [
+            {
+                "source": e.source,
+                "target": e.target,
+                "condition": e.condition,
+            }
+            for e in graph.edges
+        ],
+        "entry_point": graph.entry_point,
+    }
+    for graph_id, graph in GRAPHS.items()
+]
+
+
+async def _cancel_tasks(*tasks: Optional[asyncio.Task]):
+    """Cancel the given tasks together and wait for all of them to finish.
+
+    ``None`` entries (tasks never started) are skipped.
+    """
+    tasks = [t for t in tasks if t is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
 
 @dataclass
 class WorkerState:
@@ -48,11 +109,29 @@ class Worker:
         self.state = WorkerState(
             worker_id=worker_id or f"mock-worker-{uuid.uuid4().hex[:8]}"
         )
-
-        self._client = httpx.AsyncClient(timeout=30.0)
+        self._build_urls()
+
+        # Keep enough idle connections for a full outbox round, and keep them
+        # longer than the heartbeat interval so heartbeats reuse a connection
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=OUTBOX_BATCH_SIZE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
         self._heartbeat_task: Optional[asyncio.Task] = None
         self._poll_task: Optional[asyncio.Task] = None
+        self._outbox_task: Optional[asyncio.Task] = None
+        self._run_consumers: list[asyncio.Task] = []
         self._running = False
+        # Polled runs waiting for one of the max_concurrent_runs consumers
+        self._runs_inbox: asyncio.Queue = asyncio.Queue()
+        # Run reports (status updates, events, completion) waiting to be
+        # sent, as (run_id, kind, send) with send() returning the POST coroutine
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        # Caps event batch POSTs in flight across all runs
+        self._event_post_sem = asyncio.Semaphore(MAX_INFLIGHT_EVENT_POSTS)
 
         # Event callbacks
         self._on_event: Optional[Callable[[Event], None]] = None
@@ -60,7 +139,17 @@ class Worker:
     @property
     def api_url(self) -> str:
         """Base API URL."""
-        return f"{self.control_plane_url}/api/v1"
+        return self._api_url
+
+    def _build_urls(self):
+        """Build the endpoint URLs once; rerun whenever the worker ID changes."""
+        self._api_url = f"{self.control_plane_url}/api/v1"
+        worker_url = f"{self._api_url}/workers/{self.state.worker_id}"
+        self._register_url = f"{self._api_url}/workers/register"
+        self._heartbeat_url = f"{worker_url}/heartbeat"
+        self._poll_url = f"{worker_url}/poll"
+        self._events_url = f"{worker_url}/events"
+        self._deregister_url = f"{worker_url}/deregister"
 
     async def start(self):
         """Start the worker (register, heartbeat, poll for runs)."""
@@ -74,6 +163,13 @@ class Worker:
         # Start background tasks
         self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
         self._poll_task = asyncio.create_task(self._poll_loop())
+        self._outbox_task = asyncio.create_task(self._outbox_loop())
+        # A fixed pool of consumers bounds concurrent runs even when a poll
+        # returns a burst of tasks
+        self._run_consumers = [
+            asyncio.create_task(self._run_consumer())
+            for _ in range(config.max_concurrent_runs)
+        ]
 
         log.info("Worker started", worker_id=self.state.worker_id)
 
@@ -83,20 +179,19 @@ class Worker:
 
         self._running = False
 
-        # Cancel background tasks
-        if self._heartbeat_task:
-            self._heartbeat_task.cancel()
-            try:
-                await self._heartbeat_task
-            except asyncio.CancelledError:
-                pass
+        # Stop taking new work
+        await _cancel_tasks(self._heartbeat_task, self._poll_task)
 
-        if self._poll_task:
-            self._poll_task.cancel()
-            try:
-                await self._poll_task
-            except asyncio.CancelledError:
-                pass
+        # Let accepted runs finish, then retire the consumer pool
+        if self._run_consumers:
+            await self._runs_inbox.join()
+            await _cancel_tasks(*self._run_consumers)
+            self._run_consumers = []
+
+        # Deliver queued run reports before leaving
+        if self._outbox_task:
+            await self._outbox.join()
+            await _cancel_tasks(self._outbox_task)
 
         # Deregister
         await self._deregister()
@@ -105,49 +200,27 @@ class Worker:
 
         log.info("Worker stopped", worker_id=self.state.worker_id)
 
+    def _post_json(self, url: str, payload: Any):
+        """POST ``payload`` as a JSON body encoded with the fast serializer."""
+        return self._client.post(url, content=_dumps(payload), headers=_JSON_HEADERS)
+
     async def _register(self):
         """Register with the control plane."""
-        # Build graph definitions for registration
-        graph_definitions = []
-        for graph_id, graph in GRAPHS.items():
-            graph_definitions.append({
-                "graph_id": graph_id,
-                "name": graph.name,
-                "description": graph.description,
-                "nodes": [
-                    {
-                        "id": n.id,
-                        "type": n.type.value,
-                        "config": n.config,
-                    }
-                    for n in graph.nodes
-                ],
-                "edges": [
-                    {
-                        "source": e.source,
-                        "target": e.target,
-                        "condition": e.condition,
-                    }
-                    for e in graph.edges
-                ],
-                "entry_point": graph.entry_point,
-            })
-
         payload = {
             "worker_id": self.state.worker_id,
             "name": self.worker_name,
             "capabilities": {
-                "graphs": list(GRAPHS.keys()),
+                "graphs": _GRAPH_IDS,
                 "max_concurrent_runs": config.max_concurrent_runs,
             },
-            "graph_definitions": graph_definitions,
+            "graph_definitions": _GRAPH_DEFINITIONS,
             "status": "ready",
         }
 
         try:
-            response = await self._client.post(
-                f"{self.api_url}/workers/register",
-                json=payload,
+            response = await self._post_json(
+                self._register_url,
+                payload,
             )
 
             if response.status_code == 404:
@@ -159,13 +232,16 @@ class Worker:
             response.raise_for_status()
             result = response.json()
 
-            self.state.worker_id = result.get("worker_id", self.state.worker_id)
+            worker_id = result.get("worker_id", self.state.worker_id)
+            if worker_id != self.state.worker_id:
+                self.state.worker_id = worker_id
+                self._build_urls()
             self.state.registered = True
 
             log.info(
                 "Worker registered",
                 worker_id=self.state.worker_id,
-                graphs=list(GRAPHS.keys()),
+                graphs=_GRAPH_IDS,
             )
 
         except httpx.HTTPStatusError as e:
@@ -183,7 +259,7 @@ class Worker:
 
         try:
             response = await self._client.post(
-                f"{self.api_url}/workers/{self.state.worker_id}/deregister",
+                self._deregister_url,
             )
             if response.status_code != 404:
                 response.raise_for_status()
@@ -207,23 +283,24 @@ class Worker:
 
     async def _send_heartbeat(self):
         """Send a single heartbeat."""
+        now = datetime.now(timezone.utc)
         payload = {
             "worker_id": self.state.worker_id,
             "status": self.state.status,
             "active_runs": len(self.state.active_runs),
             "total_runs": self.state.total_runs,
             "failed_runs": self.state.failed_runs,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now.isoformat(),
         }
 
         try:
-            response = await self._client.post(
-                f"{self.api_url}/workers/{self.state.worker_id}/heartbeat",
-                json=payload,
+            response = await self._post_json(
+                self._heartbeat_url,
+                payload,
             )
             if response.status_code != 404:
                 response.raise_for_status()
-            self.state.last_heartbeat = datetime.now(timezone.utc)
+            self.state.last_heartbeat = now
         except httpx.RequestError as e:
             log.warning("Heartbeat request failed", error=str(e))
 
@@ -231,34 +308,41 @@ class Worker:
         """Poll for pending runs to execute."""
         while self._running:
             try:
-                # Only poll if we have capacity
-                if len(self.state.active_runs) < config.max_concurrent_runs:
-                    await self._poll_for_runs()
+                # Only poll if we have capacity; after a poll that returned
+                # work, poll again straight away in case more is queued
+                if self._free_slots() > 0 and await self._poll_for_runs():
+                    continue
 
-                await asyncio.sleep(1)  # Poll every second
+                await asyncio.sleep(1)  # Poll every second while idle
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 log.error("Poll error", error=str(e))
                 await asyncio.sleep(5)
 
-    async def _poll_for_runs(self):
-        """Poll control plane for pending runs."""
+    def _free_slots(self) -> int:
+        """Runs this worker can still accept, counting ones already queued."""
+        return (
+            config.max_concurrent_runs
+            - len(self.state.active_runs)
+            - self._runs_inbox.qsize()
+        )
+
+    async def _poll_for_runs(self) -> int:
+        """Poll control plane for pending runs; returns how many were accepted."""
         try:
-            response = await self._client.post(
-                f"{self.api_url}/workers/{self.state.worker_id}/poll",
-                json={
-                    "max_tasks": config.max_concurrent_runs - len(self.state.active_runs),
-                },
+            response = await self._post_json(
+                self._poll_url,
+                {"max_tasks": self._free_slots()},
             )
 
             if response.status_code == 404:
                 # Endpoint doesn't exist yet
-                return
+                return 0
 
             if response.status_code == 204:
                 # No runs available
-                return
+                return 0
 
             response.raise_for_status()
             result = response.json()
@@ -274,11 +358,24 @@ class Worker:
                     "input": task.get("input", {}),
                     "config": task.get("config", {}),
                 }
-                # Execute each run in background
-                asyncio.create_task(self._execute_run(run_data))
+                # Hand the run to the consumer pool
+                self._runs_inbox.put_nowait(run_data)
+            return len(tasks)
 
         except httpx.RequestError as e:
             log.debug("Poll request failed (control plane may not be ready)", error=str(e))
+            return 0
+
+    async def _run_consumer(self):
+        """Execute queued runs one at a time; one of max_concurrent_runs consumers."""
+        while True:
+            run_data = await self._runs_inbox.get()
+            try:
+                await self._execute_run(run_data)
+            except Exception as e:
+                log.error("Run consumer error", error=str(e))
+            finally:
+                self._runs_inbox.task_done()
 
     async def _execute_run(self, run_data: dict):
         """Execute a single run."""
@@ -304,7 +401,9 @@ class Worker:
 
         try:
             # Notify control plane that run is starting
-            await self._update_run_status(thread_id, run_id, "in_progress")
+            self._enqueue(run_id, "run_in_progress", functools.partial(
+                self._update_run_status, thread_id, run_id, "in_progress",
+            ))
 
             # Execute the graph
             state, emitter = await execute_run(
@@ -313,23 +412,35 @@ class Worker:
                 input_data=input_data,
             )
 
-            # Stream events to control plane
-            await self._send_events(thread_id, run_id, emitter.get_all_events())
-
-            # Update run with final state
-            await self._complete_run(
-                thread_id,
-                run_id,
-                status="success",
-                output=state.to_dict(),
-                tokens=emitter.get_token_summary(),
-            )
+            # Stream events and report the final state; the two go to
+            # independent endpoints, so send them concurrently
+            events = emitter.get_all_events()
+            if emitter.dropped_events:
+                log.warning(
+                    "Run exceeded event buffer; oldest events dropped",
+                    run_id=run_id,
+                    dropped=emitter.dropped_events,
+                    max_events=config.max_events_per_run,
+                )
+            output = state.to_dict()
+            tokens = emitter.get_token_summary()
+            self._enqueue(run_id, "run_completed", lambda: asyncio.gather(
+                self._send_events(thread_id, run_id, events),
+                self._complete_run(
+                    thread_id,
+                    run_id,
+                    status="success",
+                    output=output,
+                    tokens=tokens,
+                ),
+            ))
 
             log.info("Run completed", run_id=run_id, status="success")
 
         except InterruptError as e:
             # Run is interrupted, waiting for human input
-            await self._update_run_status(
+            self._enqueue(run_id, "run_interrupted", functools.partial(
+                self._update_run_status,
                 thread_id,
                 run_id,
                 "interrupted",
@@ -338,28 +449,30 @@ class Worker:
                     "prompt": e.prompt,
                     "required_fields": e.required_fields,
                 },
-            )
+            ))
             log.info("Run interrupted", run_id=run_id, node=e.node_id)
 
         except ExecutionError as e:
             self.state.failed_runs += 1
-            await self._complete_run(
+            self._enqueue(run_id, "run_failed", functools.partial(
+                self._complete_run,
                 thread_id,
                 run_id,
                 status="error",
                 error=str(e),
                 error_node=e.node_id,
-            )
+            ))
             log.error("Run failed", run_id=run_id, error=str(e), node=e.node_id)
 
         except Exception as e:
             self.state.failed_runs += 1
-            await self._complete_run(
+            self._enqueue(run_id, "run_failed", functools.partial(
+                self._complete_run,
                 thread_id,
                 run_id,
                 status="error",
                 error=str(e),
-            )
+            ))
             log.error("Run failed unexpectedly", run_id=run_id, error=str(e))
 
         finally:
@@ -367,6 +480,42 @@ class Worker:
             if not self.state.active_runs:
                 self.state.status = "idle"
 
+    def _enqueue(self, run_id: str, kind: str, send: Callable):
+        """Queue a run report for the background sender instead of awaiting it."""
+        self._outbox.put_nowait((run_id, kind, send))
+
+    async def _outbox_loop(self):
+        """Send queued run reports in rounds.
+
+        Each round takes up to ``OUTBOX_BATCH_SIZE`` queued reports and keeps
+        only the latest per ``(run_id, kind)``. Different runs' reports go out
+        concurrently; a single run's go out in order, so its completion never
+        overtakes its in-progress update.
+        """
+        while True:
+            items = [await self._outbox.get()]
+            while len(items) < OUTBOX_BATCH_SIZE and not self._outbox.empty():
+                items.append(self._outbox.get_nowait())
+
+            latest: dict[tuple[str, str], Callable] = {}
+            for run_id, kind, send in items:
+                latest.pop((run_id, kind), None)  # Move to the latest position
+                latest[(run_id, kind)] = send
+            by_run: dict[str, list[Callable]] = {}
+            for (run_id, _), send in latest.items():
+                by_run.setdefault(run_id, []).append(send)
+
+            try:
+                await asyncio.gather(*map(self._send_in_order, by_run.values()))
+            finally:
+                for _ in items:
+                    self._outbox.task_done()
+
+    @staticmethod
+    async def _send_in_order(sends: list[Callable]):
+        for send in sends:
+            await send()
+
     async def _update_run_status(
         self,
         thread_id: str,
@@ -387,9 +536,9 @@ class Worker:
             payload["data"]["metadata"] = metadata
 
         try:
-            response = await self._client.post(
-                f"{self.api_url}/workers/{self.state.worker_id}/events",
-                json=payload,
+            response = await self._post_json(
+                self._events_url,
+                payload,
             )
             if response.status_code != 404:
                 response.raise_for_status()
@@ -431,26 +580,38 @@ class Worker:
         }
 
         try:
-            response = await self._client.post(
-                f"{self.api_url}/workers/{self.state.worker_id}/events",
-                json=payload,
+            response = await self._post_json(
+                self._events_url,
+                payload,
             )
             if response.status_code != 404:
                 response.raise_for_status()
         except Exception as e:
             log.warning("Failed to complete run", run_id=run_id, error=str(e))
 
-    async def _send_events(self, thread_id: str, run_id: str, events: list[dict]):
-        """Send events to control plane."""
-        try:
-            response = await self._client.post(
-                f"{self.api_url}/threads/{thread_id}/runs/{run_id}/events",
-                json={"events": events},
-            )
-            if response.status_code != 404:
-                response.raise_for_status()
-        except Exception as e:
-            log.warning("Failed to send events", run_id=run_id, error=str(e))
+    async def _send_events(
+        self,
+        thread_id: str,
+        run_id: str,
+        events: list[dict],
+        batch_size: int = EVENT_BATCH_SIZE,
+    ):
+        """Send events to control plane in concurrent batches of ``batch_size``."""
+        url = f"{self._api_url}/threads/{thread_id}/runs/{run_id}/events"
+
+        async def send_batch(batch: list[dict]):
+            async with self._event_post_sem:
+                try:
+                    response = await self._post_json(url, {"events": batch})
+                    if response.status_code != 404:
+                        response.raise_for_status()
+                except Exception as e:
+                    log.warning("Failed to send events", run_id=run_id, error=str(e))
+
+        await asyncio.gather(*(
+            send_batch(events[i:i + batch_size])
+            for i in range(0, len(events), batch_size)
+        ))
 
     async def execute_direct(
         self,